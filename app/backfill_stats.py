@@ -0,0 +1,18 @@
+# backfill_stats.py (run as `python -m app.backfill_stats`)
+from app.database import SessionLocal
+from app.db_init import init_db
+from app.utils import client_stats
+
+def main():
+    init_db()
+    db = SessionLocal()
+    try:
+        # one full scan of client_additions, replacing whatever is there
+        written = client_stats.backfill(db)
+        db.commit()
+        print(f"Rebuilt {written} client_monthly_stats rows.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# build_static.py (run as `python -m app.build_static` at build/deploy time)
+from app.utils import static_assets
+
+def main():
+    # Same work the app does at startup, done once ahead of time
+    assets = static_assets.build()
+    unique = {a.path: a for a in assets.values()}.values()
+    compressed = sum(1 for a in unique if a.variants)
+    print(f"Fingerprinted {len(unique)} static files; {compressed} with .br/.gz variants "
+          f"in {static_assets.STATIC_BUILD_DIR}/.")
+
+if __name__ == "__main__":
+    main()
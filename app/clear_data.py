@@ -1,17 +1,26 @@
 # clear_data.py (place this alongside your `app/` folder)
 from app.database import SessionLocal
+from app.models.claim_model import Claim, EstimateLineItem
 from app.models.client_addition import ClientAddition
+from app.models.client_stats import ClientMonthlyStats
 from app.models.file_model import FileRecord
 from app.models.user_model import User
+from app.utils import search, user_cache
 
 def main():
     db = SessionLocal()
     try:
         # delete in the correct order to satisfy foreign keys
+        db.query(ClientMonthlyStats).delete()
         deleted_events = db.query(ClientAddition).delete()
+        search.clear(db)
+        db.query(EstimateLineItem).delete()
+        db.query(Claim).delete()
         deleted_files  = db.query(FileRecord).delete()
         deleted_users  = db.query(User).delete()
         db.commit()
+        # bulk deletes skip the ORM hooks that normally evict cached users
+        user_cache.clear()
         print(f"Cleared {deleted_events} client_additions, "
               f"{deleted_files} file_records, and {deleted_users} users.")
     finally:
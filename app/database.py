@@ -1,19 +1,192 @@
+import logging
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+log = logging.getLogger(__name__)
 
 # SQLite URL; change to your Postgres/MySQL URL if you want
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./vivclaims.db")
+# Same database through an asyncio driver; derived from DATABASE_URL by default
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Connection pool (ignored for in-memory SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # seconds; -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+# Checkouts that wait longer than this are logged as pool starvation
+DB_POOL_SLOW_CHECKOUT_MS = float(os.getenv("DB_POOL_SLOW_CHECKOUT_MS", "100"))
+
+# SQLite only
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_MB", "256")) * 1024 * 1024
+
+is_sqlite = DATABASE_URL.startswith("sqlite")
+is_memory = is_sqlite and (DATABASE_URL.endswith(":memory:") or DATABASE_URL in ("sqlite://", "sqlite:///"))
+
+
+class _TimedPool:
+    """Pool mixin that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self._wait_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.slow_checkouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with self._wait_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+                slow = waited * 1000 >= DB_POOL_SLOW_CHECKOUT_MS
+                if slow:
+                    self.slow_checkouts += 1
+            if slow:
+                log.warning("DB pool checkout waited %.0f ms (%s)", waited * 1000, self.status())
+
+    def recreate(self):
+        # dispose() swaps in a fresh pool; keep the counters going
+        new = super().recreate()
+        new.checkouts, new.wait_total = self.checkouts, self.wait_total
+        new.wait_max, new.slow_checkouts = self.wait_max, self.slow_checkouts
+        return new
+
 
-# For sqlite only: allow multithreaded access
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+engine_kwargs = {}
+if is_sqlite:
+    # Allow multithreaded access; the driver-level timeout matches busy_timeout
+    engine_kwargs["connect_args"] = {
+        "check_same_thread": False,
+        "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+    }
+if not is_memory:
+    engine_kwargs.update(
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+engine = create_engine(DATABASE_URL, **engine_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _sqlite_pragmas(dbapi_conn, connection_record):
+    # WAL lets readers carry on while a finalize writes; NORMAL only syncs at
+    # checkpoints, which is safe in WAL mode; busy_timeout makes writers
+    # wait for the lock instead of failing with "database is locked"
+    cur = dbapi_conn.cursor()
+    try:
+        if not is_memory:
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute(f"PRAGMA mmap_size={SQLITE_MMAP_BYTES}")
+        cur.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cur.close()
+
+
+if is_sqlite:
+    event.listen(engine, "connect", _sqlite_pragmas)
+
+
+def _async_url(url: str) -> str:
+    driver, rest = url.split("://", 1)
+    backend = driver.split("+", 1)[0]
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if backend in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def get_async_engine():
+    """The asyncio engine, created on first use (render workers never need it)."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        kwargs = dict(engine_kwargs)
+        if "poolclass" in kwargs:
+            kwargs["poolclass"] = TimedAsyncQueuePool
+        if is_sqlite:
+            kwargs["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL or _async_url(DATABASE_URL), **kwargs)
+        if is_sqlite:
+            event.listen(_async_engine.sync_engine, "connect", _sqlite_pragmas)
+        # expire_on_commit=False: reading a committed object must not trigger lazy I/O
+        _async_sessionmaker = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    get_async_engine()
+    return _async_sessionmaker()
+
+
+def _pool_stats(pool) -> dict:
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            idle=pool.checkedin(),
+        )
+    if isinstance(pool, _TimedPool):
+        stats.update(
+            checkouts=pool.checkouts,
+            wait_avg_ms=round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            wait_max_ms=round(pool.wait_max * 1000, 3),
+            slow_checkouts=pool.slow_checkouts,
+        )
+    return stats
+
+
+def pool_stats() -> dict:
+    """Pool occupancy and checkout wait times, for logs/metrics."""
+    stats = _pool_stats(engine.pool)
+    if _async_engine is not None:
+        stats["async"] = _pool_stats(_async_engine.pool)
+    return stats
+
+
 def get_db():
     """Dependency: yield a Session, then close it."""
     db = SessionLocal()
@@ -23,5 +196,7 @@ def get_db():
         db.close()
 
 
-
-
+async def get_async_db():
+    """Dependency for async handlers: yield an AsyncSession, then close it."""
+    async with AsyncSessionLocal() as db:
+        yield db
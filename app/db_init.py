@@ -1,9 +1,71 @@
+import logging
+
+from sqlalchemy import inspect, literal, text
+
 from app.database import Base, engine
 # Make sure to import your models so they get registered on Base
 from app.models.user_model import User
 from app.models.file_model import FileRecord
 from app.models.client_addition import ClientAddition
+from app.models.client_stats import ClientMonthlyStats
+from app.models.claim_model import Claim, EstimateLineItem
+from app.utils import search
+
+log = logging.getLogger(__name__)
+
+
+def _column_ddl(column, dialect) -> str:
+    """`name TYPE [NOT NULL] [DEFAULT x]` for ALTER TABLE ... ADD COLUMN."""
+    quote = dialect.identifier_preparer.quote
+    ddl = f"{quote(column.name)} {column.type.compile(dialect=dialect)}"
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if default is not None:
+        # Existing rows get the model default (e.g. render_status='done')
+        ddl += " DEFAULT " + str(literal(default, column.type).compile(
+            dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if not column.nullable:
+        if default is None:
+            # Can't backfill existing rows; leave it nullable rather than fail
+            log.warning("Adding %s.%s as nullable: no default for existing rows",
+                        column.table.name, column.name)
+        else:
+            ddl += " NOT NULL"
+    return ddl
+
+
+def add_missing_columns(bind=engine) -> list:
+    """ALTER TABLE ... ADD COLUMN for model columns an existing table lacks.
+
+    create_all only creates missing tables, so columns added to a model
+    since the table was created (render_status, content_hash, ...) would
+    otherwise never reach an existing database.
+    """
+    added = []
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue    # create_all makes it with every column
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                conn.execute(text(
+                    f"ALTER TABLE {conn.dialect.identifier_preparer.quote(table.name)} "
+                    f"ADD COLUMN {_column_ddl(column, conn.dialect)}"
+                ))
+                added.append(f"{table.name}.{column.name}")
+    return added
 
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # 1) Columns first: the indexes below may be on columns added since
+    for name in add_missing_columns(engine):
+        log.info("Added column %s", name)
+    # 2) create_all skips existing tables, so add any indexes declared since
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # 3) FTS5 / tsvector search index, which the ORM doesn't model
+    search.init_index(engine)
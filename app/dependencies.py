@@ -4,6 +4,7 @@ from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from app.models.user_model import User
 from app.database import SessionLocal
+from app.utils import user_cache
 import os
 
 # Load JWT settings from environment
@@ -38,7 +39,7 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
+    user = user_cache.get_by_email(db, email)
     if not user:
         raise credentials_exception
     return user
@@ -54,7 +55,7 @@ def require_admin(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated"
         )
-    user = db.query(User).filter(User.id == user_id).first()
+    user = user_cache.get_by_id(db, user_id)
     if not user or not (user.is_admin or user.is_superadmin):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
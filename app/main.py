@@ -1,24 +1,125 @@
+import time
+_import_start = time.perf_counter()
+
+from dotenv import load_dotenv
+load_dotenv()    # before the app modules below read their settings
+
+import asyncio
+import logging
+import os
+import sys
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import inspect
+from starlette.concurrency import run_in_threadpool
 
-from app.database import Base, engine
-from app.db_init import init_db
+from app.database import engine, dispose_async_engine, pool_stats
 from app.routes.auth_routes import router as auth_router
-from app.routes.form_routes import router as form_router
-from dotenv import load_dotenv
+from app.routes.form_routes import LOGO_PATH, finalize_router, router as form_router
+from app.utils import metrics, render_queue, static_assets
+from app.utils.auth import hasher_stats
+
+# uvicorn's own logger, so the startup report shows up in its output
+log = logging.getLogger("uvicorn.error")
+
+# Create tables at startup instead of running `python -m app.migrate` (dev only)
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "0") == "1"
+
+_imports_seconds = time.perf_counter() - _import_start
+
+
+def _startup_checks() -> bool:
+    """Returns False when there is no schema to work with yet."""
+    # Fingerprints + .br/.gz variants; only new or changed files are compressed
+    static_assets.build()
+    if AUTO_MIGRATE:
+        from app.db_init import init_db
+        init_db()
+    elif not inspect(engine).has_table("users"):
+        log.warning("Database has no tables yet; run `python -m app.migrate`")
+        return False
+    _recover_renders()
+    return True
+
+
+def _recover_renders() -> None:
+    # Renders whose process died (crash, restart) before finishing them
+    recovered = render_queue.recover_stale(LOGO_PATH)
+    if any(recovered.values()):
+        log.warning("Stale render jobs: %(requeued)d requeued, %(failed)d failed", recovered)
+
+
+async def _render_upkeep() -> None:
+    # Keep this worker's jobs' heartbeats fresh, and adopt jobs whose
+    # owner stopped sending them (another worker crashed, or a quick restart)
+    while True:
+        await asyncio.sleep(render_queue.RENDER_HEARTBEAT_SECONDS)
+        try:
+            await run_in_threadpool(render_queue.heartbeat)
+            await run_in_threadpool(_recover_renders)
+        except Exception:
+            log.exception("Render heartbeat/recovery failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start = time.perf_counter()
+    ready = await run_in_threadpool(_startup_checks)
+    upkeep = asyncio.create_task(_render_upkeep()) if ready else None
+    timings = app.state.startup
+    timings["lifespan"] = time.perf_counter() - start
+    total = sum(timings.values())
+    metrics.gauge("app_startup_seconds", "Imports, app build and lifespan startup.",
+                  lambda: total)
+    log.info(
+        "Started in %.0f ms (imports %.0f ms, app %.0f ms, startup %.0f ms); rendering stack %s",
+        total * 1000, timings["imports"] * 1000, timings["build"] * 1000,
+        timings["lifespan"] * 1000,
+        "loaded" if "reportlab" in sys.modules else "not loaded"
+    )
+    try:
+        yield
+    finally:
+        if upkeep is not None:
+            upkeep.cancel()
+        render_queue.shutdown(wait=False)
+        await dispose_async_engine()
+
+
+def prometheus_metrics():
+    # Per process: with several uvicorn workers each scrape sees one of them
+    return PlainTextResponse(metrics.render_text(), media_type="text/plain; version=0.0.4")
+
+
+def create_app() -> FastAPI:
+    """Build the app without touching the database; see lifespan for startup."""
+    start = time.perf_counter()
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    # Mount static assets (pre-compressed, fingerprinted; see static_url in templates)
+    app.mount("/static", static_assets.StaticAssets(directory=static_assets.STATIC_DIR),
+              name="static")
 
-app = FastAPI()
+    # Include your routers
+    app.include_router(auth_router)    # /login, /register, /logout
+    app.include_router(form_router)    # /, /claim-package, /clients, /admin/dashboard, etc.
+    app.include_router(finalize_router)    # /finalize, /finalize/import
+    app.add_api_route("/metrics", prometheus_metrics, include_in_schema=False)
 
-load_dotenv()
+    app.state.startup = {"imports": _imports_seconds, "build": time.perf_counter() - start}
+    return app
 
-# Initialize DB & create tables
-init_db()
-Base.metadata.create_all(bind=engine)
 
-# Mount static assets
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-app.mount("/finalized_pdfs", StaticFiles(directory="finalized_pdfs"), name="finalized_pdfs")
+# Sampled on each scrape
+metrics.gauge("render_queue_pending", "Render jobs queued or rendering in this worker.",
+              render_queue.pending)
+metrics.gauge("password_hash_pending", "bcrypt jobs queued or running.",
+              lambda: hasher_stats()["pending"])
+metrics.gauge("db_pool_checked_out", "Database connections in use.",
+              lambda: pool_stats().get("checked_out", 0))
 
-# Include your routers
-app.include_router(auth_router)    # /login, /register, /logout
-app.include_router(form_router)    # /, /claim-package, /clients, /admin/dashboard, etc.
+# `uvicorn app.main:app`, or `uvicorn --factory app.main:create_app`
+app = create_app()
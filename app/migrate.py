@@ -0,0 +1,24 @@
+# migrate.py (run as `python -m app.migrate` before starting the app)
+from sqlalchemy import inspect
+
+from app.database import SessionLocal, engine
+from app.db_init import init_db
+from app.utils import client_stats
+
+def main():
+    # Creates missing tables, columns, indexes and the search index; nothing is dropped
+    new_rollup = not inspect(engine).has_table("client_monthly_stats")
+    init_db()
+    if new_rollup:
+        # First migrate on an older database: seed the rollup from existing rows
+        db = SessionLocal()
+        try:
+            written = client_stats.backfill(db)
+            db.commit()
+            print(f"Seeded {written} client_monthly_stats rows.")
+        finally:
+            db.close()
+    print(f"Schema up to date on {engine.url.render_as_string(hide_password=True)}.")
+
+if __name__ == "__main__":
+    main()
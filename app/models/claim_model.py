@@ -0,0 +1,45 @@
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+class Claim(Base):
+    """What was submitted for a FileRecord: enough to render it again.
+
+    Shares its id with the FileRecord. Line items are bulk-inserted by
+    app/utils/claims.py.
+    """
+    __tablename__ = "claims"
+
+    id             = Column(String, ForeignKey("file_records.id"), primary_key=True)
+    claim_text     = Column(Text, nullable=False, default="")
+    claimant       = Column(String, nullable=False, default="")
+    property       = Column(String, nullable=False, default="")
+    estimator      = Column(String, nullable=False, default="")
+    estimate_type  = Column(String, nullable=False, default="")
+    date_entered   = Column(String, nullable=False, default="")
+    date_completed = Column(String, nullable=False, default="")
+    total_value    = Column(Float, nullable=False, default=0.0)
+    line_count     = Column(Integer, nullable=False, default=0)
+
+    record     = relationship("FileRecord", back_populates="claim")
+    line_items = relationship(
+        "EstimateLineItem",
+        order_by="EstimateLineItem.position",
+        cascade="all, delete-orphan"
+    )
+
+
+class EstimateLineItem(Base):
+    __tablename__ = "estimate_line_items"
+
+    claim_id      = Column(String, ForeignKey("claims.id"), primary_key=True)
+    position      = Column(Integer, primary_key=True)    # row order on the estimate
+    category      = Column(String, nullable=False, default="")
+    justification = Column(Text, nullable=False, default="")
+    total         = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        # category reports
+        Index("ix_estimate_line_items_category", "category"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -11,6 +11,13 @@ class ClientAddition(Base):
     admin_id = Column(String, ForeignKey("users.id"), nullable=False)
     client_name = Column(String, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # estimate RCV total at submission, rolled up into client_monthly_stats
+    total_value = Column(Float, default=0.0, nullable=True)
 
     # optional backref
     admin = relationship("User", back_populates="client_additions")
+
+    __table_args__ = (
+        # /clients: per-admin month ranges, newest first
+        Index("ix_client_additions_admin_id_timestamp", "admin_id", "timestamp"),
+    )
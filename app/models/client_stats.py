@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, Float, ForeignKey
+
+from app.database import Base
+
+class ClientMonthlyStats(Base):
+    """Running per-admin, per-month totals of ClientAddition rows.
+
+    Kept in step by app/utils/client_stats.py in the same transaction as
+    the ClientAddition; rebuild with `python -m app.backfill_stats`.
+    """
+    __tablename__ = "client_monthly_stats"
+
+    admin_id     = Column(String, ForeignKey("users.id"), primary_key=True)
+    year         = Column(Integer, primary_key=True)
+    month        = Column(Integer, primary_key=True)
+    client_count = Column(Integer, default=0, nullable=False)
+    total_value  = Column(Float, default=0.0, nullable=False)   # sum of estimate RCV totals
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -16,6 +16,12 @@ class Admin(Base):
     is_superadmin = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# Render job states tracked on FileRecord.render_status
+RENDER_QUEUED    = "queued"
+RENDER_RENDERING = "rendering"
+RENDER_DONE      = "done"
+RENDER_FAILED    = "failed"
+
 class FileRecord(Base):
     __tablename__ = "file_records"
 
@@ -27,4 +33,27 @@ class FileRecord(Base):
     uploaded_by = Column(String, ForeignKey("users.id"), nullable=False)
     created_at  = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # Render job state + timings (see app/utils/render_queue.py)
+    render_status = Column(String, default=RENDER_DONE, nullable=False)
+    render_error  = Column(String, nullable=True)
+    queued_at     = Column(DateTime, nullable=True)
+    started_at    = Column(DateTime, nullable=True)
+    finished_at   = Column(DateTime, nullable=True)
+    # Refreshed by the process that owns a queued/rendering job; a stale one
+    # means that process died and another requeues the job
+    render_heartbeat_at = Column(DateTime, nullable=True)
+    # Render cache key; records with the same hash share artifacts
+    content_hash  = Column(String, index=True, nullable=True)
+
     uploader    = relationship("User", back_populates="files")
+    claim       = relationship("Claim", back_populates="record", uselist=False,
+                               cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # /clients: one uploader's files, newest first
+        Index("ix_file_records_uploaded_by_created_at", "uploaded_by", "created_at"),
+        # admin dashboard: everyone's files, keyset on (created_at, id)
+        Index("ix_file_records_created_at_id", "created_at", "id"),
+        # render recovery: the few records still queued/rendering
+        Index("ix_file_records_render_status", "render_status"),
+    )
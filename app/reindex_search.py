@@ -0,0 +1,18 @@
+# reindex_search.py (run as `python -m app.reindex_search`)
+from app.database import SessionLocal
+from app.db_init import init_db
+from app.utils import search
+
+def main():
+    init_db()
+    db = SessionLocal()
+    try:
+        # rebuilds the whole index from the claims tables
+        indexed = search.reindex(db)
+        db.commit()
+        print(f"Indexed {indexed} records for search.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
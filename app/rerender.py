@@ -0,0 +1,209 @@
+# rerender.py (run as `python -m app.rerender`)
+# Re-renders archived claims from their stored inputs, e.g. after a logo or
+# layout change. Rendering fans out over one process per available core;
+# only this process touches the database.
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+from app.database import SessionLocal, engine
+from app.db_init import init_db
+from app.models.file_model import FileRecord, RENDER_DONE
+from app.utils import claims, render_cache
+from app.utils.render_pipeline import PDF, XLSX
+from app.utils.storage import get_storage
+
+LOGO_PATH = os.path.abspath("app/static/logo2.jpg")
+BATCH_SIZE = 200      # records read per query
+
+
+def _cpu_count() -> int:
+    # Cores this process may run on (cgroup/taskset aware), not the whole box
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker():
+    # Workers never use the database; drop any inherited connections
+    engine.dispose(close=False)
+
+
+def _render(content_hash: str, record_id: str, client_name: str,
+            claim_text: str, estimate_data):
+    """Runs in a worker: render both formats into storage, return (keys, seconds, bytes)."""
+    from app.utils.render_pipeline import render_claim
+
+    keys = render_cache.destination_keys(content_hash, record_id, client_name)
+    result = render_claim(
+        logo_path=LOGO_PATH,
+        client_name=client_name,
+        claim_text=claim_text,
+        estimate_data=estimate_data,
+        keys=keys
+    )
+    return keys, result.total_seconds, result.total_bytes
+
+
+def _records(db, since=None, client=None, limit=None):
+    """Yield (id, client_name) oldest first, BATCH_SIZE rows per query."""
+    q = db.query(FileRecord.created_at, FileRecord.id, FileRecord.client_name)
+    q = q.filter(FileRecord.claim.has())
+    if since:
+        q = q.filter(FileRecord.created_at >= since)
+    if client:
+        q = q.filter(FileRecord.client_name == client)
+
+    seen, last = 0, None
+    while limit is None or seen < limit:
+        page = q
+        if last is not None:
+            page = page.filter(tuple_(FileRecord.created_at, FileRecord.id) > last)
+        size = BATCH_SIZE if limit is None else min(BATCH_SIZE, limit - seen)
+        batch = page.order_by(FileRecord.created_at, FileRecord.id).limit(size).all()
+        if not batch:
+            return
+        for created_at, record_id, client_name in batch:
+            yield record_id, client_name
+        seen += len(batch)
+        last = tuple_(batch[-1].created_at, batch[-1].id)
+
+
+def _apply(db, record_ids, keys, content_hash):
+    """Point the records at their new artifacts; returns replaced per-record keys."""
+    stale = []
+    for record in db.query(FileRecord).filter(FileRecord.id.in_(record_ids)):
+        for old in {record.pdf_path, record.excel_path} - set(keys.values()):
+            if old and not old.startswith(render_cache.RENDER_CACHE_PREFIX + "/"):
+                stale.append(old)   # cache entries are shared; eviction handles those
+        record.file_path = keys[PDF]
+        record.pdf_path = keys[PDF]
+        record.excel_path = keys[XLSX]
+        record.content_hash = content_hash
+        record.render_status = RENDER_DONE
+        record.render_error = None
+        record.finished_at = datetime.utcnow()
+    db.commit()
+    # Deduplicated renders share per-record keys; keep any still referenced
+    return [key for key in stale if not db.query(FileRecord.id).filter(
+        (FileRecord.pdf_path == key) | (FileRecord.excel_path == key)).first()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-render archived claim packages.")
+    parser.add_argument("--workers", type=int, default=_cpu_count(),
+                        help="render processes (default: available cores)")
+    parser.add_argument("--since", type=datetime.fromisoformat,
+                        help="only records created on/after this date (YYYY-MM-DD)")
+    parser.add_argument("--client", help="only this client's records")
+    parser.add_argument("--limit", type=int, help="stop after this many records")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="count what would be rendered, render nothing")
+    args = parser.parse_args(argv)
+
+    init_db()
+    storage = get_storage()
+    db = SessionLocal()
+
+    # 1) Group records by their content hash under the current template, so
+    #    identical claims are rendered once
+    start = time.perf_counter()
+    records = failed = rendered = cached = 0
+    render_seconds = render_bytes = 0
+    failures = []
+    waiting = {}          # content_hash -> [record ids]
+    in_flight = {}        # future -> content_hash
+    max_in_flight = args.workers * 4
+
+    def collect(done):
+        nonlocal rendered, failed, render_seconds, render_bytes
+        for future in done:
+            content_hash = in_flight.pop(future)
+            ids = waiting.pop(content_hash)
+            try:
+                keys, seconds, size = future.result()
+            except Exception as e:
+                failed += len(ids)
+                failures.extend((i, f"{type(e).__name__}: {e}") for i in ids)
+                continue
+            rendered += 1
+            render_seconds += seconds
+            render_bytes += size
+            for old in _apply(db, ids, keys, content_hash):
+                storage.delete(old)
+
+    executor = None
+    if not args.dry_run:
+        executor = ProcessPoolExecutor(
+            max_workers=args.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    try:
+        for record_id, client_name in _records(db, args.since, args.client, args.limit):
+            records += 1
+            claim_text, estimate = claims.load_claim(db, record_id)
+            db.expunge_all()    # loaded claims aren't needed once handed off
+
+            content_hash = render_cache.cache_key(claim_text, estimate.to_dict())
+            if content_hash in waiting:
+                waiting[content_hash].append(record_id)
+                continue
+            if args.dry_run:
+                waiting[content_hash] = [record_id]
+                continue
+
+            # 2) Already rendered under this template (by /finalize or an earlier run)
+            keys = render_cache.lookup(content_hash)
+            if keys is not None:
+                cached += 1
+                for old in _apply(db, [record_id], keys, content_hash):
+                    storage.delete(old)
+                continue
+
+            # 3) Otherwise render on the pool, holding a bounded number of jobs
+            waiting[content_hash] = [record_id]
+            future = executor.submit(_render, content_hash, record_id, client_name,
+                                     claim_text, estimate)
+            in_flight[future] = content_hash
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        if in_flight:
+            collect(wait(in_flight).done)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        db.close()
+
+    if render_cache.enabled() and not args.dry_run:
+        render_cache.evict()
+
+    # 4) Report
+    elapsed = time.perf_counter() - start
+    if args.dry_run:
+        print(f"{records} records, {len(waiting)} distinct renders.")
+    else:
+        print(f"{records} records in {elapsed:.1f}s with {args.workers} workers: "
+              f"{rendered} rendered, {cached} already cached, {failed} failed.")
+        if rendered:
+            print(f"  {rendered / elapsed:.1f} renders/s, "
+                  f"{render_bytes / 1024 / 1024 / elapsed:.1f} MB/s written, "
+                  f"{render_seconds / rendered:.3f}s average render")
+    for record_id, error in failures[:50]:
+        print(f"  FAILED {record_id}: {error}", file=sys.stderr)
+    if len(failures) > 50:
+        print(f"  ... and {len(failures) - 50} more", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
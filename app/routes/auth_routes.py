@@ -5,38 +5,68 @@ from fastapi import (
 )
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user_model import User
 from app.schemas.user_schema import UserCreate
-from app.utils.auth import hash_password, verify_password
+from app.utils.auth import (
+    PasswordHasherBusy, hash_password_async,
+    verify_password_async, verify_and_update_async
+)
 from email.message import EmailMessage
 from fastapi import BackgroundTasks
 from app.dependencies import require_admin
+from app.utils.static_assets import static_url
 import os
 import smtplib
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["static_url"] = static_url
+
+# Sent with 503s when the bcrypt pool is saturated
+HASHER_RETRY_AFTER = "2"
+
+
+def _hasher_busy(request: Request, template: str):
+    return templates.TemplateResponse(
+        template,
+        {"request": request, "error": "The server is busy, please try again in a moment."},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": HASHER_RETRY_AFTER}
+    )
+
+
+async def _user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(User).where(User.email == email).limit(1))
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == user.email).first():
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    if await _user_by_email(db, user.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
+    try:
+        hashed = await hash_password_async(user.password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, try again shortly",
+            headers={"Retry-After": HASHER_RETRY_AFTER}
+        )
     new_user = User(
         id=str(uuid.uuid4()),
         email=user.email,
-        hashed_password=hash_password(user.password),
+        hashed_password=hashed,
         is_admin=True,
         is_superadmin=False
     )
     db.add(new_user)
-    db.commit()
+    await db.commit()
     return {"message": "User registered successfully."}
 
 
@@ -46,13 +76,23 @@ def login_get(request: Request):
 
 
 @router.post("/login", response_class=HTMLResponse)
-+ def login_post(request: Request,
+async def login_post(request: Request,
                  email: str = Form(...),
                  password: str = Form(...),
-                 db: Session = Depends(get_db)
+                 db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+    user = await _user_by_email(db, email)
+    valid = False
+    if user:
+        try:
+            valid, new_hash = await verify_and_update_async(password, user.hashed_password)
+        except PasswordHasherBusy:
+            return _hasher_busy(request, "login.html")
+        if valid and new_hash:
+            # stored hash used other BCRYPT_ROUNDS; upgrade it
+            user.hashed_password = new_hash
+            await db.commit()
+    if not valid:
         # bad creds
         return templates.TemplateResponse(
             "login.html",
@@ -90,14 +130,14 @@ def add_admin_get(request: Request):
     return templates.TemplateResponse("add_admin.html", {"request": request})
 
 @router.post("/admin/add-admin", response_class=HTMLResponse)
-def add_admin_post(
+async def add_admin_post(
     request: Request,
     background_tasks: BackgroundTasks,
     email: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 1) Prevent duplicates
-    if db.query(User).filter(User.email == email).first():
+    if await _user_by_email(db, email):
         return templates.TemplateResponse(
             "add_admin.html",
             {"request": request, "error": "That email’s already registered."},
@@ -106,15 +146,19 @@ def add_admin_post(
 
     # 2) Create temp password & user
     temp_pw = uuid.uuid4().hex[:8]
+    try:
+        hashed = await hash_password_async(temp_pw)
+    except PasswordHasherBusy:
+        return _hasher_busy(request, "add_admin.html")
     new_user = User(
         id=str(uuid.uuid4()),
         email=email,
-        hashed_password=hash_password(temp_pw),
+        hashed_password=hashed,
         is_admin=True,
         is_superadmin=False
     )
     db.add(new_user)
-    db.commit()
+    await db.commit()
 
     # 3) Prepare email‐sending function with logging
     def send_invite_email():
@@ -156,16 +200,20 @@ def change_password_get(request: Request):
     return templates.TemplateResponse("change_password.html", {"request": request})
 
 @router.post("/change-password", response_class=HTMLResponse)
-def change_password_post(
+async def change_password_post(
     request: Request,
     old_password: str = Form(...),
     new_password: str = Form(...),
     confirm_password: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(require_admin)
 ):
     # verify current password
-    if not verify_password(old_password, user.hashed_password):
+    try:
+        valid = await verify_password_async(old_password, user.hashed_password)
+    except PasswordHasherBusy:
+        return _hasher_busy(request, "change_password.html")
+    if not valid:
         return templates.TemplateResponse(
             "change_password.html",
             {"request": request, "error": "Current password is incorrect."},
@@ -178,9 +226,14 @@ def change_password_post(
             status_code=status.HTTP_400_BAD_REQUEST
         )
 
-    # update and save
-    user.hashed_password = hash_password(new_password)
-    db.add(user)
-    db.commit()
+    try:
+        hashed = await hash_password_async(new_password)
+    except PasswordHasherBusy:
+        return _hasher_busy(request, "change_password.html")
+
+    # update and save (require_admin hands out a cached, detached copy)
+    db_user = await db.get(User, user.id)
+    db_user.hashed_password = hashed
+    await db.commit()
 
     return RedirectResponse("/admin/dashboard", status_code=status.HTTP_302_FOUND)
\ No newline at end of file
@@ -1,29 +1,81 @@
 from fastapi import (
-    APIRouter, Request, Form, Depends, status, Query
+    APIRouter, Request, Form, Depends, status, Query, HTTPException,
+    File, UploadFile
 )
 from fastapi.responses import (
-    HTMLResponse, FileResponse, RedirectResponse
+    HTMLResponse, FileResponse, RedirectResponse, JSONResponse,
+    StreamingResponse
 )
+from fastapi.routing import APIRoute
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from uuid import uuid4
 from datetime import datetime
+from urllib.parse import quote
+import asyncio
+import logging
+import math
 import os
+import time
 
-from app.database import get_db
+from app.database import get_db, get_async_db, SessionLocal
 from app.dependencies import require_admin
 from app.models.user_model import User     
 from app.models.user_model import User
-from app.models.file_model import FileRecord
+from app.models.file_model import (
+    FileRecord, RENDER_QUEUED, RENDER_RENDERING, RENDER_DONE, RENDER_FAILED
+)
 from app.models.client_addition import ClientAddition
-from app.utils.pdf_generator import generate_pdf
-from app.utils.excel_generator import generate_excel
+from app.utils import claims, client_stats, metrics, render_cache, render_queue, search
+from app.utils.render_pipeline import PDF, XLSX
+from app.utils.estimate_import import EstimateImportError, parse_estimate_rows
+from app.utils.estimate_model import Estimate
+from app.utils.pagination import clamp_limit, keyset_page, month_range
+from app.utils.static_assets import static_url
+from app.utils.storage import get_storage
+from app.utils.render_queue import RenderQueueFull
 from uuid import uuid4
 
+log = logging.getLogger(__name__)
+
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["static_url"] = static_url
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+LOGO_PATH = os.path.abspath("app/static/logo2.jpg")
+
+# How long the post-finalize redirect holds the download open for the render
+FINALIZE_WAIT_SECONDS = int(os.getenv("FINALIZE_WAIT_SECONDS", "60"))
+MAX_WAIT_SECONDS = 120
+POLL_INTERVAL_SECONDS = 0.5
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class _TimedFormRoute(APIRoute):
+    """Times the form/multipart body parse, which FastAPI does before the
+    handler runs, as the "parse" finalize stage."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request):
+            try:
+                with metrics.finalize_stage.time(stage="parse"):
+                    await request.form()    # cached on the request; the handler reuses it
+            except Exception:
+                # The handler parses again and answers 400 itself
+                log.exception("Parsing the %s body failed", request.url.path)
+            return await handler(request)
+        return timed_handler
+
+
+# /finalize and /finalize/import, with the body parse timed (see app.main)
+finalize_router = APIRouter(route_class=_TimedFormRoute)
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -47,7 +99,7 @@ async def contents_estimate_post(
     )
 
 
-@router.post("/finalize", response_class=FileResponse)
+@finalize_router.post("/finalize", response_class=RedirectResponse)
 async def finalize_form(
     claimant: str = Form(...),
     property_name: str = Form(..., alias="property"),
@@ -60,22 +112,26 @@ async def finalize_form(
     total: Optional[List[str]] = Form([]),
     client_name: str = Form(...),
     claim_text: str = Form(...),
-    db: Session = Depends(get_db),
+    stream: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(require_admin)
 ):
     # 1) Build the table rows
     rows = []
-    for cat, just, tot in zip(category, justification, total):
-        try:
-            amt = float(tot.strip()) if tot and tot.strip() else 0.0
-        except ValueError:
-            amt = 0.0
-        if cat.strip() or just.strip() or amt > 0:
-            rows.append({
-                "category": cat.strip(),
-                "justification": just.strip(),
-                "total": amt
-            })
+    with metrics.finalize_stage.time(stage="rows"):
+        for cat, just, tot in zip(category, justification, total):
+            try:
+                amt = float(tot.strip()) if tot and tot.strip() else 0.0
+            except ValueError:
+                amt = 0.0
+            if not math.isfinite(amt):    # "nan"/"inf" parse as floats
+                amt = 0.0
+            if cat.strip() or just.strip() or amt > 0:
+                rows.append({
+                    "category": cat.strip(),
+                    "justification": just.strip(),
+                    "total": amt
+                })
 
     # 2) Prepare the data dict
     estimate_data = {
@@ -87,105 +143,438 @@ async def finalize_form(
         "date_completed": date_completed,
         "rows": rows
     }
+    return await _submit_claim(db, user, client_name, claim_text, estimate_data, stream)
 
-    # 3) Define logo path
-    logo_path = os.path.abspath("app/static/logo2.jpg")
 
-    # 4) Generate PDF (unwrap tuple if necessary)
-    pdf_result = generate_pdf(
-        logo_path=logo_path,
-        client_name=client_name,
-        claim_text=claim_text,
-        estimate_data=estimate_data
-    )
-    pdf_path = pdf_result[0] if isinstance(pdf_result, (tuple, list)) else pdf_result
+@finalize_router.post("/finalize/import")
+async def finalize_import(
+    items: UploadFile = File(...),
+    claimant: str = Form(...),
+    property_name: str = Form(..., alias="property"),
+    estimator: str = Form(...),
+    estimate_type: str = Form(...),
+    date_entered: str = Form(...),
+    date_completed: str = Form(...),
+    client_name: str = Form(...),
+    claim_text: str = Form(...),
+    stream: bool = Query(False),
+    dry_run: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(require_admin)
+):
+    """Finalize with the line items from an uploaded CSV/XLSX instead of form rows.
+
+    Any invalid row rejects the whole upload with a 422 listing each
+    problem; ``dry_run=1`` only validates.
+    """
+    # 1) Parse off the event loop; the upload is already spooled to disk
+    try:
+        with metrics.finalize_stage.time(stage="rows"):
+            result = await run_in_threadpool(parse_estimate_rows, items.file, items.filename)
+    except EstimateImportError as e:
+        return JSONResponse({"detail": str(e), "errors": []},
+                            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    summary = {
+        "rows": len(result.rows),
+        "total": round(result.total, 2),
+        "error_count": result.error_count,
+        "errors": [e.as_dict() for e in result.errors],
+    }
+    if not result.ok:
+        return JSONResponse({"detail": "Some rows could not be imported", **summary},
+                            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    if dry_run:
+        return summary
 
-    # 5) Generate Excel
-    excel_path = generate_excel(
-        pdf_path=pdf_path,
-        logo_path=logo_path,
-        claim_text=claim_text,
-        estimate_data=estimate_data,
-        client_name=client_name
+    # 2) Same path as the form submission from here on
+    estimate_data = {
+        "claimant": claimant,
+        "property": property_name,
+        "estimator": estimator,
+        "estimate_type": estimate_type,
+        "date_entered": date_entered,
+        "date_completed": date_completed,
+        "rows": result.rows
+    }
+    return await _submit_claim(db, user, client_name, claim_text, estimate_data, stream)
+
+
+async def _submit_claim(db: AsyncSession, user: User, client_name: str,
+                        claim_text: str, estimate_data: dict, stream: bool):
+    """Record a finalized claim and render it (or reuse a cached render)."""
+    # 1) Columnar estimate, built once for the claim rows, rollup and renderers
+    estimate = Estimate.from_dict(estimate_data)
+
+    # 2) Identical submissions reuse the cached render; anything else needs a
+    # render slot, held before any row is written so a 503 leaves nothing behind
+    content_hash = render_cache.cache_key(claim_text, estimate_data)
+    cached = render_cache.lookup(content_hash)
+    record_id = str(uuid4())
+    if not cached:
+        try:
+            render_queue.reserve(record_id)
+        except RenderQueueFull:
+            return _queue_full()
+    try:
+        return await _save_and_render(db, user, record_id, client_name, claim_text,
+                                      estimate, content_hash, cached, stream)
+    finally:
+        render_queue.release(record_id)
+
+
+def _queue_full():
+    return JSONResponse(
+        {"detail": "Too many claims rendering, please retry shortly."},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "5"}
     )
 
-    # 6) Save file record (now with an id)
+
+async def _save_and_render(db: AsyncSession, user: User, record_id: str, client_name: str,
+                           claim_text: str, estimate: Estimate, content_hash: str,
+                           cached: Optional[dict], stream: bool):
+    # 1) Save file record...
+    now = datetime.utcnow()
     record = FileRecord(
-        id=str(uuid4()),          # ← generate a new UUID here
+        id=record_id,
         client_name=client_name,
-        file_path=pdf_path,     # ← now non-null
-        pdf_path=pdf_path,
-        excel_path=excel_path,
-        uploaded_by=user.id
+        file_path=cached[PDF] if cached else "",
+        pdf_path=cached[PDF] if cached else "",
+        excel_path=cached[XLSX] if cached else "",
+        uploaded_by=user.id,
+        render_status=RENDER_DONE if cached else RENDER_QUEUED,
+        queued_at=now,
+        render_heartbeat_at=None if cached else now,
+        started_at=now if cached else None,
+        finished_at=now if cached else None,
+        content_hash=content_hash
     )
     db.add(record)
+    # ...and what was submitted, so the artifacts can be rendered again
+    await db.run_sync(claims.save_claim, record.id, claim_text, estimate)
+    await db.run_sync(search.index_claim, record.id, client_name, claim_text, estimate)
 
-    # 7) Track client addition
+    # 2) Track client addition (+ the monthly rollup, same transaction)
+    total_value = estimate.grand_total
     track = ClientAddition(
         id=str(uuid4()),
         admin_id=user.id,
         client_name=client_name,
-        timestamp=datetime.utcnow()
+        timestamp=now,
+        total_value=total_value
     )
     db.add(track)
+    await db.run_sync(client_stats.record_addition, user.id, now, total_value)
 
-    db.commit()
+    with metrics.finalize_stage.time(stage="db_commit"):
+        await db.commit()
+
+    # 3) Identical submission: the artifacts are already stored
+    if cached and stream:
+        return _artifact_response(record, PDF, cached[PDF])
+
+    # 4) Hand the PDF/XLSX work to the render pool (on the reserved slot)
+    render_args = dict(
+        logo_path=LOGO_PATH,
+        client_name=client_name,
+        claim_text=claim_text,
+        estimate_data=estimate
+    )
+    if not cached:
+        if stream:
+            return await _render_and_stream(db, record, render_args)
+        render_queue.submit(record.id, content_hash=content_hash, **render_args)
+
+    # 5) Send the browser to the download, which waits for any render
+    return RedirectResponse(
+        url=f"/render-jobs/{record.id}/download?format=pdf&wait={FINALIZE_WAIT_SECONDS}",
+        status_code=status.HTTP_303_SEE_OTHER
+    )
+
+
+def _download_name(record: FileRecord, fmt: str) -> str:
+    return f"{record.client_name.replace(' ', '_')}_Claim.{fmt}"
+
+
+def _content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _chunks(data: bytes):
+    with metrics.finalize_stage.time(stage="response"):
+        for i in range(0, len(data), STREAM_CHUNK_SIZE):
+            yield data[i:i + STREAM_CHUNK_SIZE]
+
+
+async def _render_and_stream(db: AsyncSession, record: FileRecord, render_args: dict):
+    """Render in memory on the pool and stream the PDF straight back.
+
+    Both artifacts are written to the render cache after the response has
+    been sent, so the request never waits on a write-then-read of the PDF.
+    """
+    record.render_status = RENDER_RENDERING
+    record.started_at = datetime.utcnow()
+    await db.commit()
+
+    try:
+        with metrics.finalize_stage.time(stage="render_wait"):
+            result = await render_queue.render_in_memory(record.id, **render_args)
+    except Exception as e:
+        record.render_status = RENDER_FAILED
+        record.render_error = f"{type(e).__name__}: {e}"
+        record.finished_at = datetime.utcnow()
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Rendering the claim package failed"
+        )
 
-    # 8) Return the PDF
-    return FileResponse(
-        path=pdf_path,
-        filename=os.path.basename(pdf_path),
-        media_type="application/pdf"
+    pdf = result.artifacts[PDF].data
+    return StreamingResponse(
+        _chunks(pdf),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": _content_disposition(_download_name(record, PDF)),
+            "Content-Length": str(len(pdf)),
+        },
+        background=BackgroundTask(_persist_render, record.id, record.content_hash, result)
     )
 
 
+def _persist_render(job_id: str, content_hash: str, result) -> None:
+    """Background task: store in-memory artifacts and mark the record done."""
+    db = SessionLocal()
+    try:
+        record = db.get(FileRecord, job_id)
+        try:
+            keys = render_cache.destination_keys(content_hash, job_id, record.client_name)
+            paths = render_cache.store(result, keys)
+        except Exception as e:
+            record.render_status = RENDER_FAILED
+            record.render_error = f"{type(e).__name__}: {e}"
+        else:
+            record.file_path = paths[PDF]
+            record.pdf_path = paths[PDF]
+            record.excel_path = paths[XLSX]
+            record.render_status = RENDER_DONE
+        record.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+def _job_status(record: FileRecord) -> dict:
+    def iso(ts):
+        return ts.isoformat() if ts else None
+
+    def seconds(start, end):
+        return round((end - start).total_seconds(), 3) if start and end else None
+
+    data = {
+        "id": record.id,
+        "client_name": record.client_name,
+        "status": record.render_status,
+        "error": record.render_error,
+        "queued_at": iso(record.queued_at),
+        "started_at": iso(record.started_at),
+        "finished_at": iso(record.finished_at),
+        "queue_seconds": seconds(record.queued_at, record.started_at),
+        "render_seconds": seconds(record.started_at, record.finished_at),
+    }
+    if record.render_status == RENDER_DONE:
+        data["pdf_url"] = f"/render-jobs/{record.id}/download?format=pdf"
+        data["excel_url"] = f"/render-jobs/{record.id}/download?format=xlsx"
+    return data
+
+
+async def _get_job(db: AsyncSession, job_id: str) -> FileRecord:
+    record = await db.get(FileRecord, job_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown render job")
+    return record
+
+
+def _stored(key: str) -> bool:
+    # Records from before the storage layer hold plain filesystem paths
+    return bool(key) and (get_storage().exists(key) or os.path.isfile(key))
+
+
+async def _rerender(db: AsyncSession, record: FileRecord) -> None:
+    """Queue a fresh render for a record whose artifacts are gone."""
+    loaded = await db.run_sync(claims.load_claim, record.id)
+    if loaded is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artifact missing")
+    claim_text, estimate = loaded
+
+    # The template may have changed since, so hash again
+    record.content_hash = render_cache.cache_key(claim_text, estimate.to_dict())
+    cached = render_cache.lookup(record.content_hash)
+    if cached:
+        record.file_path = cached[PDF]
+        record.pdf_path = cached[PDF]
+        record.excel_path = cached[XLSX]
+        await db.commit()
+        return
+
+    # Hold a slot first, so a full queue leaves the record untouched
+    try:
+        render_queue.reserve(record.id)
+    except RenderQueueFull:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many claims rendering, please retry shortly.",
+            headers={"Retry-After": "5"}
+        )
+    try:
+        record.render_status = RENDER_QUEUED
+        record.render_error = None
+        record.queued_at = record.render_heartbeat_at = datetime.utcnow()
+        record.started_at = record.finished_at = None
+        await db.commit()
+        render_queue.submit(
+            record.id, content_hash=record.content_hash, logo_path=LOGO_PATH,
+            client_name=record.client_name, claim_text=claim_text, estimate_data=estimate
+        )
+    finally:
+        render_queue.release(record.id)
+
+
+@router.get("/render-jobs/{job_id}")
+async def render_job_status(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(require_admin)
+):
+    return _job_status(await _get_job(db, job_id))
+
+
+@router.get("/render-jobs/{job_id}/download")
+async def render_job_download(
+    job_id: str,
+    format: str = Query("pdf", pattern="^(pdf|xlsx)$"),
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(require_admin)
+):
+    record = await _get_job(db, job_id)
+
+    # Artifacts evicted from storage are rendered again from the stored claim
+    if record.render_status == RENDER_DONE and not (
+            _stored(record.pdf_path) and _stored(record.excel_path)):
+        await _rerender(db, record)
+        wait = max(wait, FINALIZE_WAIT_SECONDS)
+
+    # Optionally hold the request open until the render finishes
+    loop = asyncio.get_running_loop()
+    started, deadline = loop.time(), loop.time() + wait
+    waited = record.render_status in (RENDER_QUEUED, RENDER_RENDERING) and wait > 0
+    while record.render_status in (RENDER_QUEUED, RENDER_RENDERING):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        if not await render_queue.wait_for(job_id, remaining):
+            await asyncio.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+        await db.refresh(record)
+    if waited:
+        metrics.finalize_stage.observe(loop.time() - started, stage="render_wait")
+
+    if record.render_status == RENDER_FAILED:
+        return JSONResponse(_job_status(record), status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    if record.render_status != RENDER_DONE:
+        # Browsers honour Refresh, so a form submit keeps retrying by itself
+        return JSONResponse(
+            _job_status(record),
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Retry-After": "2", "Refresh": "2"}
+        )
+
+    key = record.pdf_path if format == PDF else record.excel_path
+    return _artifact_response(record, format, key)
+
+
+def _artifact_response(record: FileRecord, fmt: str, key: str):
+    storage = get_storage()
+    media_type = "application/pdf" if fmt == PDF else XLSX_MEDIA_TYPE
+    # Cached artifacts are shared, so name the download after this record
+    filename = _download_name(record, fmt)
+
+    if key and storage.exists(key):
+        path = storage.local_path(key)
+        if path is not None:
+            return _TimedFileResponse(path=path, filename=filename, media_type=media_type)
+        return StreamingResponse(
+            _iter_file(storage.open(key)),
+            media_type=media_type,
+            headers={"Content-Disposition": _content_disposition(filename)}
+        )
+    # Records from before the storage layer hold plain filesystem paths
+    if key and os.path.isfile(key):
+        return _TimedFileResponse(path=key, filename=filename, media_type=media_type)
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artifact missing")
+
+
+class _TimedFileResponse(FileResponse):
+    async def __call__(self, scope, receive, send):
+        with metrics.finalize_stage.time(stage="response"):
+            await super().__call__(scope, receive, send)
+
+
+def _iter_file(fh):
+    try:
+        with metrics.finalize_stage.time(stage="response"):
+            while chunk := fh.read(STREAM_CHUNK_SIZE):
+                yield chunk
+    finally:
+        fh.close()
+
 
 @router.get("/clients", response_class=HTMLResponse)
 def list_files(
     request: Request,
-    month: Optional[int] = Query(None),
-    year: Optional[int] = Query(None),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=1, le=9998),
     uploader_email: Optional[str] = Query(None, alias="uploader_email"),
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
 
     users = db.query(User).order_by(User.email).all()
 
-
-    # — Files, optionally filtered by uploader_email
-    files_q = db.query(FileRecord)
+    # Resolve the uploader once so both queries hit the (user, time) indexes
+    uploader_id = None
     if uploader_email:
-        files_q = files_q.join(
-            User, FileRecord.uploaded_by == User.id
-        ).filter(User.email == uploader_email)
-    files = files_q.order_by(FileRecord.created_at.desc()).all()
+        uploader = next((u for u in users if u.email == uploader_email), None)
+        uploader_id = uploader.id if uploader else ""
 
-    # — ClientAddition events, filtered by uploader_email/month/year
-    events_q = db.query(ClientAddition)
-    if uploader_email:
-        events_q = events_q.join(
-            User, ClientAddition.admin_id == User.id
-        ).filter(User.email == uploader_email)
-    if month:
-        events_q = events_q.filter(
-            func.extract("month", ClientAddition.timestamp) == month
-        )
-    if year:
-        events_q = events_q.filter(
-            func.extract("year", ClientAddition.timestamp) == year
-        )
-    events = events_q.order_by(ClientAddition.timestamp.desc()).all()
+    try:
+        # — Files, optionally filtered by uploader_email
+        files_q = db.query(FileRecord)
+        if uploader_id is not None:
+            files_q = files_q.filter(FileRecord.uploaded_by == uploader_id)
+        files = keyset_page(files_q, FileRecord.created_at, FileRecord.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    event_count = len(events)
+    # — Clients added, filtered by uploader_email/month/year (from the monthly rollup)
+    event_count = client_stats.client_count(db, uploader_id, year, month)
+
+    next_url = None
+    if files.next_cursor:
+        next_url = str(request.url.include_query_params(cursor=files.next_cursor))
 
     return templates.TemplateResponse(
         "clients.html",
         {
             "request": request,
             "users": users,                   # ← add this
-            "files": files,
-            "events": events,
+            "files": files.items,
+            "next_url": next_url,
             "filter_month": month,
             "filter_year": year,
             "filter_uploader": uploader_email,
@@ -193,19 +582,157 @@ def list_files(
         }
     )
 
+@router.get("/admin/stats")
+def admin_stats(
+    year: Optional[int] = Query(None, ge=1, le=9998),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    uploader_email: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin)
+):
+    """Clients added and estimate totals per admin and month, from the rollup."""
+    admins = {u.id: u.email for u in db.query(User.id, User.email)}
+    admin_id = None
+    if uploader_email:
+        admin_id = next((i for i, e in admins.items() if e == uploader_email), "")
+    rows = client_stats.monthly(db, admin_id, year, month)
+    return {
+        "months": [
+            {
+                "admin": admins.get(row.admin_id),
+                "year": row.year,
+                "month": row.month,
+                "client_count": row.client_count,
+                "total_value": round(row.total_value, 2),
+            }
+            for row in rows
+        ],
+        "client_count": sum(row.client_count for row in rows),
+        "total_value": round(sum(row.total_value for row in rows), 2),
+    }
+
+
+@router.get("/admin/reports/categories")
+def category_report(
+    year: Optional[int] = Query(None, ge=1, le=9998),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    uploader_email: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin)
+):
+    """Line items and totals per estimate category, from the stored claims."""
+    uploader_id = None
+    if uploader_email:
+        uploader = db.query(User.id).filter(User.email == uploader_email).first()
+        uploader_id = uploader.id if uploader else ""
+    start = end = None
+    if year:
+        start, end = month_range(year, month)
+    rows = claims.category_report(db, uploader_id, start, end, month)
+    return {
+        "categories": [
+            {
+                "category": category,
+                "items": items,
+                "claims": claim_count,
+                "total_value": round(total, 2),
+            }
+            for category, items, claim_count, total in rows
+        ],
+        "items": sum(row[1] for row in rows),
+        "total_value": round(sum(row[3] for row in rows), 2),
+    }
+
+
+@router.get("/search")
+def search_claims(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: Optional[int] = Query(None),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin)
+):
+    """Ranked full-text search over client, claimant, property, estimator,
+    claim text and justifications."""
+    start = time.perf_counter()
+    limit = clamp_limit(limit)
+    hits = search.search(db, q, limit, offset)
+    more = len(hits) > limit
+    hits = hits[:limit]
+
+    # One query for the records behind this page of hits
+    records = {
+        r.id: r for r in db.query(FileRecord).options(selectinload(FileRecord.claim))
+        .filter(FileRecord.id.in_([h.record_id for h in hits]))
+    }
+    results = []
+    for hit in hits:
+        record = records.get(hit.record_id)
+        if record is None:
+            continue
+        claim = record.claim
+        results.append({
+            **_job_status(record),
+            "created_at": record.created_at.isoformat(),
+            "claimant": claim.claimant if claim else None,
+            "property": claim.property if claim else None,
+            "estimator": claim.estimator if claim else None,
+            "score": round(hit.score, 4),
+            "snippet": hit.snippet,
+        })
+    return {
+        "hits": results,
+        "next_offset": offset + limit if more else None,
+        "took_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def _dashboard_page(db: Session, cursor: Optional[str], limit: Optional[int]):
+    # selectinload: one extra query for all uploaders on the page, not one per row
+    files_q = db.query(FileRecord).options(selectinload(FileRecord.uploader))
+    try:
+        return keyset_page(files_q, FileRecord.created_at, FileRecord.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _dashboard_row(record: FileRecord) -> dict:
+    data = _job_status(record)
+    data["created_at"] = record.created_at.isoformat()
+    data["uploaded_by"] = record.uploader.email if record.uploader else None
+    return data
+
+
 @router.get("/admin/dashboard", response_class=HTMLResponse)
 def admin_dashboard(
     request: Request,
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None),
     db: Session = Depends(get_db),
     user: User = Depends(require_admin)
 ):
-    files = db.query(FileRecord).order_by(FileRecord.created_at.desc()).all()
+    page = _dashboard_page(db, cursor, limit)
     return templates.TemplateResponse(
         "admin_dashboard.html",
-        {"request": request, "files": files}
+        {"request": request, "files": page.items, "next_cursor": page.next_cursor}
     )
 
 
+@router.get("/admin/dashboard/files")
+def admin_dashboard_files(
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+    user: User = Depends(require_admin)
+):
+    """JSON pages of the dashboard file list, for infinite scroll."""
+    page = _dashboard_page(db, cursor, limit)
+    return {
+        "files": [_dashboard_row(record) for record in page.items],
+        "next_cursor": page.next_cursor
+    }
+
+
 @router.post("/admin/add-client", response_class=RedirectResponse)
 def add_client(
     client_name: str = Form(...),
@@ -214,21 +741,25 @@ def add_client(
 ):
     # Record new client
     record = FileRecord(
+        id=str(uuid4()),
         client_name=client_name,
         pdf_path="",
         excel_path="",
         uploaded_by=user.id
     )
     db.add(record)
+    search.index_claim(db, record.id, client_name)
 
     # Track addition
+    now = datetime.utcnow()
     track = ClientAddition(
         id=str(uuid4()),
         admin_id=user.id,
         client_name=client_name,
-        timestamp=datetime.utcnow()
+        timestamp=now
     )
     db.add(track)
+    client_stats.record_addition(db, user.id, now)
 
     db.commit()
     return RedirectResponse(
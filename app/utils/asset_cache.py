@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+
+from reportlab.lib.utils import ImageReader
+
+# Most recently used images kept decoded in this process
+ASSET_CACHE_SIZE = int(os.getenv("ASSET_CACHE_SIZE", "16"))
+# How often a cached path is re-stat'ed to notice a replaced file
+ASSET_CACHE_CHECK_SECONDS = float(os.getenv("ASSET_CACHE_CHECK_SECONDS", "5"))
+
+
+@dataclass(frozen=True)
+class ImageAsset:
+    path: str
+    mtime_ns: int
+    data: bytes            # raw file bytes, e.g. for xlsxwriter's image_data
+    reader: ImageReader    # decoded once, shared by every PDF render
+    width: int
+    height: int
+
+    def stream(self) -> BytesIO:
+        return BytesIO(self.data)
+
+
+_images = OrderedDict()    # (path, mtime_ns) -> ImageAsset
+_checked = {}              # path -> (mtime_ns, monotonic time of last stat)
+_lock = threading.Lock()
+hits = 0
+misses = 0
+
+
+def _current_mtime(path: str) -> int:
+    now = time.monotonic()
+    seen = _checked.get(path)
+    if seen and now - seen[1] < ASSET_CACHE_CHECK_SECONDS:
+        return seen[0]
+    mtime_ns = os.stat(path).st_mtime_ns
+    _checked[path] = (mtime_ns, now)
+    return mtime_ns
+
+
+def get_image(path: str) -> ImageAsset:
+    """Return the decoded image at ``path``, reading the file only on a miss."""
+    global hits, misses
+    path = os.path.abspath(path)
+    with _lock:
+        key = (path, _current_mtime(path))
+        asset = _images.get(key)
+        if asset is not None:
+            _images.move_to_end(key)
+            hits += 1
+            return asset
+        misses += 1
+
+    with open(path, "rb") as fh:
+        data = fh.read()
+    reader = ImageReader(BytesIO(data))
+    reader.getRGBData()    # force the decode now, not on first draw
+    width, height = reader.getSize()
+    asset = ImageAsset(path, key[1], data, reader, width, height)
+
+    with _lock:
+        # Drop stale versions of this path along with the least recently used
+        for stale in [k for k in _images if k[0] == path]:
+            del _images[stale]
+        _images[key] = asset
+        while len(_images) > ASSET_CACHE_SIZE:
+            _images.popitem(last=False)
+    return asset
+
+
+def stats() -> dict:
+    with _lock:
+        return {"entries": len(_images), "hits": hits, "misses": misses}
+
+
+def clear() -> None:
+    with _lock:
+        _images.clear()
+        _checked.clear()
@@ -1,5 +1,9 @@
+import asyncio
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from jose import jwt
 from passlib.context import CryptContext
 
@@ -8,7 +12,30 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost; hashes made with other rounds are upgraded on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads doing bcrypt work (the bcrypt C code releases the GIL)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Hashes allowed to wait for a worker before callers get PasswordHasherBusy
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when PASSWORD_HASH_QUEUE_LIMIT hashes are already pending."""
+
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+_hash_lock = threading.Lock()
+_hash_pending = 0       # submitted, not yet finished (queued + running)
+_hash_running = 0
+_hash_completed = 0
+_hash_rejected = 0
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -16,6 +43,64 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def _tracked(fn, *args):
+    global _hash_running, _hash_pending, _hash_completed
+    with _hash_lock:
+        _hash_running += 1
+    try:
+        return fn(*args)
+    finally:
+        with _hash_lock:
+            _hash_running -= 1
+            _hash_pending -= 1
+            _hash_completed += 1
+
+
+async def _run_hasher(fn, *args):
+    global _hash_pending, _hash_rejected
+    with _hash_lock:
+        if _hash_pending >= PASSWORD_HASH_QUEUE_LIMIT:
+            _hash_rejected += 1
+            raise PasswordHasherBusy(f"{_hash_pending} password hashes already pending")
+        _hash_pending += 1
+    try:
+        future = _hash_executor.submit(_tracked, fn, *args)
+    except BaseException:
+        with _hash_lock:
+            _hash_pending -= 1
+        raise
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password() on the bcrypt pool, without blocking the event loop."""
+    return await _run_hasher(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hasher(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_async(plain_password: str,
+                                  hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify on the bcrypt pool; also returns a new hash if the stored one
+    was made with different BCRYPT_ROUNDS (None otherwise)."""
+    return await _run_hasher(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def hasher_stats() -> dict:
+    with _hash_lock:
+        return {
+            "workers": PASSWORD_HASH_WORKERS,
+            "queue_limit": PASSWORD_HASH_QUEUE_LIMIT,
+            "pending": _hash_pending,
+            "queued": _hash_pending - _hash_running,
+            "running": _hash_running,
+            "completed": _hash_completed,
+            "rejected": _hash_rejected,
+        }
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (
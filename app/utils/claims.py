@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.claim_model import Claim, EstimateLineItem
+from app.models.file_model import FileRecord
+from app.utils.estimate_model import HEADER_FIELDS, Estimate
+
+
+def save_claim(db: Session, record_id: str, claim_text: str, estimate: Estimate) -> None:
+    """Store a FileRecord's claim text and estimate rows; caller commits.
+
+    The line items go in as one executemany, not one INSERT per row.
+    """
+    db.add(Claim(
+        id=record_id,
+        claim_text=claim_text or "",
+        total_value=estimate.grand_total,
+        line_count=len(estimate),
+        **{k: estimate.get(k, "") or "" for k in HEADER_FIELDS}
+    ))
+    # The parent rows must exist before the Core insert below references them
+    db.flush()
+    items = [
+        {"claim_id": record_id, "position": i, "category": category,
+         "justification": justification, "total": total}
+        for i, (category, justification, total) in enumerate(estimate.rows())
+    ]
+    if items:
+        db.execute(insert(EstimateLineItem), items)
+
+
+def load_claim(db: Session, record_id: str) -> Optional[Tuple[str, Estimate]]:
+    """(claim_text, Estimate) for a record, or None if it has no stored claim."""
+    claim = db.get(Claim, record_id)
+    if claim is None:
+        return None
+
+    rows = db.execute(
+        select(EstimateLineItem.category, EstimateLineItem.justification, EstimateLineItem.total)
+        .where(EstimateLineItem.claim_id == record_id)
+        .order_by(EstimateLineItem.position)
+    )
+    estimate = Estimate.from_rows(
+        ({"category": c, "justification": j, "total": t} for c, j, t in rows),
+        {k: getattr(claim, k) for k in HEADER_FIELDS}
+    )
+    return claim.claim_text, estimate
+
+
+def category_report(db: Session, uploader_id: Optional[str] = None,
+                    start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    month: Optional[int] = None):
+    """(category, line items, claims, total) per category, largest total first.
+
+    ``month`` without a range matches that month in any year, like /admin/stats.
+    """
+    q = db.query(
+        EstimateLineItem.category,
+        func.count(),
+        func.count(func.distinct(EstimateLineItem.claim_id)),
+        func.coalesce(func.sum(EstimateLineItem.total), 0.0)
+    ).join(FileRecord, FileRecord.id == EstimateLineItem.claim_id)
+    if uploader_id is not None:
+        q = q.filter(FileRecord.uploaded_by == uploader_id)
+    if start is not None:
+        q = q.filter(FileRecord.created_at >= start, FileRecord.created_at < end)
+    elif month:
+        q = q.filter(func.extract("month", FileRecord.created_at) == month)
+    return q.group_by(EstimateLineItem.category).order_by(
+        func.sum(EstimateLineItem.total).desc()
+    ).all()
@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.client_addition import ClientAddition
+from app.models.client_stats import ClientMonthlyStats
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+
+def record_addition(db: Session, admin_id: str, when: datetime,
+                    total_value: float = 0.0) -> None:
+    """Bump the rollup row for a new ClientAddition; caller commits.
+
+    Uses a single INSERT ... ON CONFLICT DO UPDATE, so concurrent
+    submissions for the same admin and month never lose a count.
+    """
+    insert = _UPSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        row = db.get(ClientMonthlyStats, (admin_id, when.year, when.month))
+        if row is None:
+            row = ClientMonthlyStats(admin_id=admin_id, year=when.year, month=when.month,
+                                     client_count=0, total_value=0.0)
+            db.add(row)
+        row.client_count += 1
+        row.total_value += total_value
+        return
+
+    stmt = insert(ClientMonthlyStats).values(
+        admin_id=admin_id, year=when.year, month=when.month,
+        client_count=1, total_value=total_value
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["admin_id", "year", "month"],
+        set_={
+            "client_count": ClientMonthlyStats.client_count + 1,
+            "total_value": ClientMonthlyStats.total_value + total_value,
+        }
+    ))
+
+
+def _filtered(query, admin_id: Optional[str], year: Optional[int], month: Optional[int]):
+    if admin_id is not None:
+        query = query.filter(ClientMonthlyStats.admin_id == admin_id)
+    if year:
+        query = query.filter(ClientMonthlyStats.year == year)
+    if month:
+        query = query.filter(ClientMonthlyStats.month == month)
+    return query
+
+
+def client_count(db: Session, admin_id: Optional[str] = None,
+                 year: Optional[int] = None, month: Optional[int] = None) -> int:
+    """Clients added, summed over at most admins x months rollup rows."""
+    q = db.query(func.coalesce(func.sum(ClientMonthlyStats.client_count), 0))
+    return _filtered(q, admin_id, year, month).scalar()
+
+
+def monthly(db: Session, admin_id: Optional[str] = None,
+            year: Optional[int] = None, month: Optional[int] = None):
+    q = db.query(ClientMonthlyStats)
+    return _filtered(q, admin_id, year, month).order_by(
+        ClientMonthlyStats.year.desc(), ClientMonthlyStats.month.desc(),
+        ClientMonthlyStats.admin_id
+    ).all()
+
+
+def backfill(db: Session) -> int:
+    """Rebuild every rollup row from client_additions; returns rows written."""
+    year = func.extract("year", ClientAddition.timestamp)
+    month = func.extract("month", ClientAddition.timestamp)
+    groups = db.query(
+        ClientAddition.admin_id, year, month,
+        func.count(ClientAddition.id),
+        func.coalesce(func.sum(ClientAddition.total_value), 0.0)
+    ).group_by(ClientAddition.admin_id, year, month).all()
+
+    db.query(ClientMonthlyStats).delete()
+    db.add_all(
+        ClientMonthlyStats(admin_id=admin_id, year=int(y), month=int(m),
+                           client_count=count, total_value=float(total))
+        for admin_id, y, m, count, total in groups
+    )
+    return len(groups)
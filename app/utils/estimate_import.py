@@ -0,0 +1,170 @@
+import codecs
+import csv
+import os
+import math
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator, List, Optional, Sequence
+
+# Largest estimate accepted in one upload, and how many row errors to report
+MAX_IMPORT_ROWS = int(os.getenv("MAX_IMPORT_ROWS", "20000"))
+MAX_IMPORT_ERRORS = 100
+
+# Accepted header spellings for each estimate column
+COLUMNS = {
+    "category": ("category", "item", "room"),
+    "justification": ("justification", "description", "notes"),
+    "total": ("total", "amount", "rcv", "replacement cost", "replacement cost value"),
+}
+REQUIRED = ("category", "total")
+
+_MONEY_JUNK = re.compile(r"[$,\s]")
+
+
+class EstimateImportError(ValueError):
+    """The upload can't be read as an estimate at all (bad type, no header, ...)."""
+
+
+@dataclass
+class RowError:
+    row: int                # 1-based row number in the sheet, header included
+    column: Optional[str]
+    message: str
+
+    def as_dict(self) -> dict:
+        return {"row": self.row, "column": self.column, "message": self.message}
+
+
+@dataclass
+class ImportResult:
+    rows: List[dict] = field(default_factory=list)
+    errors: List[RowError] = field(default_factory=list)
+    error_count: int = 0        # may exceed len(errors), which is capped
+
+    @property
+    def ok(self) -> bool:
+        return self.error_count == 0
+
+    @property
+    def total(self) -> float:
+        return sum(r["total"] for r in self.rows)
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _csv_rows(fh: BinaryIO) -> Iterator[Sequence]:
+    # Decode incrementally; utf-8-sig drops the BOM Excel puts on CSV exports
+    text = codecs.getreader("utf-8-sig")(fh, errors="replace")
+    yield from csv.reader(text)
+
+
+def _xlsx_rows(fh: BinaryIO) -> Iterator[Sequence]:
+    from openpyxl import load_workbook    # only needed for .xlsx uploads
+
+    # read_only streams rows from the sheet XML instead of building every cell
+    wb = load_workbook(fh, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _reader(fh: BinaryIO, filename: str) -> Iterator[Sequence]:
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext == ".csv":
+        return _csv_rows(fh)
+    if ext in (".xlsx", ".xlsm"):
+        return _xlsx_rows(fh)
+    raise EstimateImportError("Upload a .csv or .xlsx file")
+
+
+def _header_map(header: Sequence) -> dict:
+    names = [_cell(h).lower() for h in header]
+    positions = {}
+    for col, aliases in COLUMNS.items():
+        for i, name in enumerate(names):
+            if name in aliases:
+                positions[col] = i
+                break
+    missing = [c for c in REQUIRED if c not in positions]
+    if missing:
+        raise EstimateImportError(
+            f"Missing column(s): {', '.join(missing)} (header row: {', '.join(n for n in names if n)})"
+        )
+    return positions
+
+
+def parse_amount(raw: str) -> Decimal:
+    """'$1,234.50' -> Decimal('1234.50'); '(12.00)' counts as negative."""
+    text = _MONEY_JUNK.sub("", raw)
+    if text.startswith("(") and text.endswith(")"):
+        text = "-" + text[1:-1]
+    return Decimal(text)
+
+
+def parse_estimate_rows(fh: BinaryIO, filename: str,
+                        max_rows: int = MAX_IMPORT_ROWS) -> ImportResult:
+    """Read, validate and normalise estimate line items one row at a time.
+
+    Rows come back in the same shape finalize_form builds from the form
+    fields. Blank rows are skipped; every other problem is reported per
+    row rather than stopping at the first one.
+    """
+    result = ImportResult()
+
+    def error(row_no, column, message):
+        result.error_count += 1
+        if len(result.errors) < MAX_IMPORT_ERRORS:
+            result.errors.append(RowError(row_no, column, message))
+
+    positions = None
+    for row_no, values in enumerate(_reader(fh, filename), start=1):
+        cells = [_cell(v) for v in values]
+        if not any(cells):
+            continue
+        if positions is None:
+            positions = _header_map(cells)
+            continue
+
+        def get(col):
+            i = positions.get(col)
+            return cells[i] if i is not None and i < len(cells) else ""
+
+        category, justification, raw_total = get("category"), get("justification"), get("total")
+        try:
+            amount = parse_amount(raw_total) if raw_total else Decimal(0)
+            # NaN/Infinity parse fine, and 1e400 overflows to inf as a float
+            finite = amount.is_finite() and math.isfinite(float(amount))
+            negative = finite and amount < 0
+        except InvalidOperation:
+            error(row_no, "total", f"Not a number: {raw_total!r}")
+            continue
+        if not finite:
+            error(row_no, "total", f"Not a finite amount: {raw_total!r}")
+            continue
+        if negative:
+            error(row_no, "total", f"Negative total: {raw_total}")
+            continue
+        if not category:
+            error(row_no, "category", "Category is required")
+            continue
+
+        if len(result.rows) >= max_rows:
+            error(row_no, None, f"More than {max_rows} line items")
+            break
+        result.rows.append({
+            "category": category,
+            "justification": justification,
+            "total": float(amount)
+        })
+
+    if positions is None:
+        raise EstimateImportError("The file has no header row")
+    return result
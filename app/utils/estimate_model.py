@@ -0,0 +1,85 @@
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple, Union
+
+HEADER_FIELDS = (
+    "claimant", "property", "estimator",
+    "estimate_type", "date_entered", "date_completed"
+)
+UNCATEGORIZED = "Uncategorized"
+
+
+@dataclass
+class Estimate:
+    """Column-oriented estimate: one array per field instead of a dict per row.
+
+    Built once per submission; grand total and per-category subtotals are
+    computed in the same pass, so the renderers never re-sum the rows.
+    It pickles far smaller than the row dicts on its way to a render worker.
+    """
+    header: Dict[str, str] = field(default_factory=dict)
+    categories: List[str] = field(default_factory=list)            # distinct, first-seen order
+    category_idx: array = field(default_factory=lambda: array("I"))  # row -> categories index
+    justifications: List[str] = field(default_factory=list)
+    totals: array = field(default_factory=lambda: array("d"))
+    subtotals: array = field(default_factory=lambda: array("d"))     # per category
+    counts: array = field(default_factory=lambda: array("I"))        # per category
+    grand_total: float = 0.0
+
+    @classmethod
+    def from_rows(cls, rows, header: Dict[str, str] = None) -> "Estimate":
+        est = cls(header={k: (header or {}).get(k, "") for k in HEADER_FIELDS})
+        index = {}
+        for row in rows:
+            category = sys.intern(row.get("category", "") or "")
+            amount = float(row.get("total", 0.0) or 0.0)
+            i = index.get(category)
+            if i is None:
+                i = index[category] = len(est.categories)
+                est.categories.append(category)
+                est.subtotals.append(0.0)
+                est.counts.append(0)
+            est.category_idx.append(i)
+            est.justifications.append(row.get("justification", "") or "")
+            est.totals.append(amount)
+            est.subtotals[i] += amount
+            est.counts[i] += 1
+        est.grand_total = sum(est.subtotals)
+        return est
+
+    @classmethod
+    def from_dict(cls, estimate_data: dict) -> "Estimate":
+        return cls.from_rows(estimate_data.get("rows", []), estimate_data)
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+    def get(self, key: str, default: str = "") -> str:
+        """Header lookup, so renderers can treat this like the old dict."""
+        return self.header.get(key, default)
+
+    def rows(self) -> Iterator[Tuple[str, str, float]]:
+        cats = self.categories
+        for i, total in enumerate(self.totals):
+            yield cats[self.category_idx[i]], self.justifications[i], total
+
+    def summary(self) -> Iterator[Tuple[str, int, float]]:
+        """(category, item count, subtotal) per category, in first-seen order."""
+        for i, category in enumerate(self.categories):
+            yield category or UNCATEGORIZED, self.counts[i], self.subtotals[i]
+
+    def to_dict(self) -> dict:
+        return {
+            **self.header,
+            "rows": [
+                {"category": c, "justification": j, "total": t}
+                for c, j, t in self.rows()
+            ]
+        }
+
+
+def as_estimate(estimate_data: Union[dict, Estimate]) -> Estimate:
+    if isinstance(estimate_data, Estimate):
+        return estimate_data
+    return Estimate.from_dict(estimate_data)
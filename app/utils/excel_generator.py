@@ -1,24 +1,34 @@
 import os
 import xlsxwriter
 
-def generate_excel(pdf_path: str,
-                   logo_path: str,
-                   claim_text: str,
-                   estimate_data: dict,
-                   client_name: str) -> str:
-    # ———————————————————————————————
-    # Guard against tuple/list (e.g. if pdf_path was returned as (path, ...))
-    if isinstance(pdf_path, (tuple, list)):
-        pdf_path = pdf_path[0]
-    # ———————————————————————————————
-
-    out_dir = os.path.dirname(pdf_path)
-    os.makedirs(out_dir, exist_ok=True)
+from .asset_cache import get_image
+from .estimate_model import as_estimate
+from .storage import artifact_key, get_storage
 
-    safe = client_name.replace(" ", "_")
-    excel_path = os.path.join(out_dir, f"{safe}_Claim.xlsx")
+# Stream rows to disk instead of holding the whole sheet in memory
+EXCEL_CONSTANT_MEMORY = os.getenv("EXCEL_CONSTANT_MEMORY", "1") != "0"
+LAST_COL = 99      # background spans columns A:CV, as the old 100x100 fill did
 
-    wb = xlsxwriter.Workbook(excel_path)
+def generate_excel(logo_path: str,
+                   claim_text: str,
+                   estimate_data: dict,
+                   client_name: str,
+                   constant_memory: bool = EXCEL_CONSTANT_MEMORY,
+                   output=None,
+                   key: str = None):
+    # Without a file object, write atomically into artifact storage
+    if output is None:
+        key = key or artifact_key(client_name, "xlsx")
+        with get_storage().open_write(key) as fh:
+            generate_excel(logo_path, claim_text, estimate_data, client_name,
+                           constant_memory=constant_memory, output=fh)
+        return key
+
+    estimate = as_estimate(estimate_data)
+
+    # constant_memory flushes each row to disk as soon as the next one starts,
+    # so memory stays flat no matter how many estimate rows there are
+    wb = xlsxwriter.Workbook(output, {'constant_memory': constant_memory})
 
     # === FORMATS ===
     bg_fmt = wb.add_format({
@@ -63,39 +73,46 @@ def generate_excel(pdf_path: str,
         'border': 1
     })
 
+    # Cached logo bytes; xlsxwriter stores identical images only once
+    try:
+        logo = get_image(logo_path)
+    except OSError:
+        logo = None
+
+    def insert_logo(ws):
+        if logo is not None:
+            ws.insert_image('A1', logo.path, {
+                'image_data': logo.stream(), 'x_scale': 0.39, 'y_scale': 0.36
+            })
+
     # === SHEET 1: Claim Package ===
     ws1 = wb.add_worksheet('Claim Package')
-    for row in range(100):
-        for col in range(100):
-            ws1.write_blank(row, col, None, bg_fmt)
     ws1.hide_gridlines(2)
     ws1.set_tab_color('#FFFDFA')
-    ws1.set_column('A:H', 15)
-    for row in range(40):
-        for col in range(8):
-            ws1.write_blank(row, col, None, bg_fmt)
+    # Background comes from column defaults, not per-cell blanks
+    ws1.set_column('A:H', 15, bg_fmt)
+    ws1.set_column(8, LAST_COL, None, bg_fmt)
     for r in range(9, 15):
         ws1.set_row(r, 20, bg_fmt)
     ws1.merge_range('A1:H15', '', border_fmt)
-    ws1.insert_image('A1', logo_path, {'x_scale': 0.39, 'y_scale': 0.36})
+    insert_logo(ws1)
     ws1.merge_range('A16:H40', claim_text, border_fmt)
 
     # === SHEET 2: Contents Estimate ===
+    # Written strictly top-to-bottom so constant_memory can flush each row
     ws2 = wb.add_worksheet("Contents Estimate")
-    for row in range(100):
-        for col in range(100):
-            ws2.write_blank(row, col, None, bg_fmt)
     ws2.hide_gridlines(2)
     ws2.set_tab_color('#FFFDFA')
     ws2.set_column('A:D', 31, bg_fmt)
-    for r in range(100):
-        ws2.set_row(r, 15)
-    for col in range(4):
-        ws2.write(15, col, '', dark_fmt)
-        ws2.write(22, col, '', dark_fmt)
-        ws2.write(24, col, '', dark_fmt)
+    ws2.set_column(4, LAST_COL, None, bg_fmt)
     ws2.merge_range('A1:D15', '', border_fmt)
-    ws2.insert_image('A1', logo_path, {'x_scale': 0.39, 'y_scale': 0.36})
+    insert_logo(ws2)
+
+    def dark_row(r):
+        for col in range(4):
+            ws2.write_blank(r, col, None, dark_fmt)
+
+    dark_row(15)
 
     labels = [
         "Claimant", "Property", "Estimator",
@@ -104,31 +121,48 @@ def generate_excel(pdf_path: str,
     for idx, label in enumerate(labels):
         r = 16 + idx
         key = label.lower().replace(" ", "_")
-        val = estimate_data.get(key, "")
+        val = estimate.get(key, "")
         ws2.merge_range(r, 0, r, 1, label, yellow_bold_fmt)
         ws2.merge_range(r, 2, r, 3, val, yellow_bold_fmt)
 
+    dark_row(22)
     ws2.set_row(23, 49)
-    total = sum(row.get("total", 0.0) for row in estimate_data.get("rows", []))
     ws2.merge_range(
         'A24:D24',
-        f"Total Replacement Cost Value: ${total:,.2f}",
+        f"Total Replacement Cost Value: ${estimate.grand_total:,.2f}",
         grey_bold_fmt
     )
+    dark_row(24)
 
     ws2.write(25, 0, 'Category', yellow_bold_fmt)
     ws2.merge_range(25, 1, 25, 2, 'Defensible Justification', yellow_bold_fmt)
     ws2.write(25, 3, 'Total', yellow_bold_fmt)
 
     start_row = 26
-    for i, row in enumerate(estimate_data.get('rows', [])):
+    for i, (category, justification, row_total) in enumerate(estimate.rows()):
         r = start_row + i
-        ws2.write(r, 0, row.get('category', ""), border_fmt)
-        ws2.merge_range(r, 1, r, 2, row.get('justification', ""), border_fmt)
-        ws2.write(r, 3, row.get('total', 0.0), currency_fmt)
+        ws2.write(r, 0, category, border_fmt)
+        ws2.merge_range(r, 1, r, 2, justification, border_fmt)
+        ws2.write(r, 3, row_total, currency_fmt)
+
+    # Category subtotals, below the line items
+    r = start_row + len(estimate) + 1
+    dark_row(r)
+    r += 1
+    ws2.set_row(r, 30)
+    ws2.merge_range(r, 0, r, 3, "Category Subtotals", grey_bold_fmt)
+    r += 1
+    ws2.write(r, 0, 'Category', yellow_bold_fmt)
+    ws2.merge_range(r, 1, r, 2, 'Items', yellow_bold_fmt)
+    ws2.write(r, 3, 'Subtotal', yellow_bold_fmt)
+    for category, count, subtotal in estimate.summary():
+        r += 1
+        ws2.write(r, 0, category, border_fmt)
+        ws2.merge_range(r, 1, r, 2, count, border_fmt)
+        ws2.write(r, 3, subtotal, currency_fmt)
 
     wb.close()
-    return excel_path
+    return output
 
 
 
@@ -0,0 +1,196 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+# Per-process counters and histograms, exposed as Prometheus text at /metrics.
+# Each uvicorn worker keeps its own; render workers report back through the
+# RenderResult they return, so their timings are recorded here too.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6)
+
+_lock = threading.Lock()
+_registry = {}
+
+
+def _label_str(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _lines(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_label_str(self.labels, key)} {_num(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}       # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[n]) for n in self.labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _lines(self):
+        for key, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_num(bound)}"'
+                yield f"{self.name}_bucket{_label_str(self.labels, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_label_str(self.labels, key)} {_num(series[-1])}"
+            yield f"{self.name}_count{_label_str(self.labels, key)} {cumulative}"
+
+
+class Gauge:
+    """Read at scrape time from ``fn`` (queue depths, pool occupancy)."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn):
+        self.name, self.help, self.fn = name, help, fn
+
+    def _lines(self):
+        yield f"{self.name} {_num(self.fn())}"
+
+
+def _register(metric):
+    with _lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def counter(name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+    return _register(Counter(name, help, labels))
+
+
+def histogram(name: str, help: str, labels: Iterable[str] = (),
+              buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labels, buckets))
+
+
+def gauge(name: str, help: str, fn) -> Gauge:
+    return _register(Gauge(name, help, fn))
+
+
+def render_text() -> str:
+    """Everything registered, in the Prometheus text exposition format."""
+    out = []
+    with _lock:
+        metrics = [_registry[name] for name in sorted(_registry)]
+        for metric in metrics:
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric._lines())
+    return "\n".join(out) + "\n"
+
+
+def row_band(rows: int) -> str:
+    """Coarse row-count label, so render metrics can be split by estimate size."""
+    for limit, label in ((10, "1-10"), (100, "11-100"), (1000, "101-1k"), (10000, "1k-10k")):
+        if rows <= limit:
+            return label
+    return "10k+"
+
+
+# === APPLICATION METRICS ===
+http_requests = counter(
+    "http_requests_total", "HTTP requests by route template and status.",
+    ("method", "route", "status"))
+http_latency = histogram(
+    "http_request_duration_seconds", "Time to the end of the response body.",
+    ("method", "route"))
+finalize_stage = histogram(
+    "finalize_stage_seconds",
+    "Time spent in each stage of a finalize: parse, rows, db_commit, render_wait, response.",
+    ("stage",))
+render_seconds = histogram(
+    "render_seconds", "Generator time per artifact.", ("format", "rows"))
+render_bytes = histogram(
+    "render_output_bytes", "Artifact size.", ("format", "rows"), BYTES_BUCKETS)
+
+
+def record_render(result) -> None:
+    """Record each artifact of a RenderResult (timed inside the render worker)."""
+    band = row_band(result.rows)
+    for artifact in result.artifacts.values():
+        render_seconds.observe(artifact.seconds, format=artifact.format, rows=band)
+        render_bytes.observe(artifact.size, format=artifact.format, rows=band)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route template.
+
+    Labels use the matched route's path ("/render-jobs/{job_id}"), never the
+    raw URL, so the series count stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        finished = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                finished = time.perf_counter()     # background tasks run after this
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # FastAPI stores the matched route in the scope; mounts set root_path
+            route = getattr(scope.get("route"), "path", None) or scope.get("root_path") or "unmatched"
+            http_requests.inc(method=scope["method"], route=route, status=status_code)
+            http_latency.observe((finished or time.perf_counter()) - start,
+                                 method=scope["method"], route=route)
@@ -0,0 +1,71 @@
+import base64
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+# Rows per page on the listing pages, and the most a caller may ask for
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = 200
+
+
+@dataclass
+class Page:
+    items: List
+    next_cursor: Optional[str]
+
+
+def encode_cursor(ts: datetime, row_id: str) -> str:
+    raw = f"{ts.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        ts, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), row_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def keyset_page(query, ts_col, id_col, cursor: Optional[str] = None,
+                limit: Optional[int] = None) -> Page:
+    """Newest-first page of ``query`` ordered by (ts_col, id_col).
+
+    Seeks past the cursor with a row-value comparison, so each page is an
+    index range scan however deep the caller pages; no OFFSET.
+    """
+    limit = clamp_limit(limit)
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(ts_col, id_col) < tuple_(ts, row_id))
+    rows = query.order_by(ts_col.desc(), id_col.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, ts_col.key), getattr(last, id_col.key))
+    return Page(rows, next_cursor)
+
+
+def month_range(year: int, month: Optional[int] = None) -> Tuple[datetime, datetime]:
+    """[start, end) of a month, or of the whole year when month is None.
+
+    Range predicates on the raw column can use an index; extract() can't.
+    """
+    if month is None:
+        return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    if month == 12:
+        return datetime(year, 12, 1), datetime(year + 1, 1, 1)
+    return datetime(year, month, 1), datetime(year, month + 1, 1)
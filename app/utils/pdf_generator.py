@@ -1,63 +1,103 @@
+from reportlab import rl_config
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.units import inch
-from reportlab.lib.utils import ImageReader
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.platypus import Paragraph
 import xml.sax.saxutils as saxutils
-import os
+from collections import deque
+from functools import lru_cache
 
-from .excel_generator import generate_excel  # relative import
+from .asset_cache import get_image
+from .estimate_model import as_estimate
+from .storage import artifact_key, get_storage
+
+# Binary (Flate-only) streams; ASCII85 on top costs ~25% in size and
+# a pure-Python encode pass over every page
+rl_config.useA85 = 0
 
 # === COLOR PALETTE ===
 bg_color   = colors.HexColor("#FEFDF9")
 text_color = colors.HexColor("#3D4335")
 
 # === STYLES ===
-styles     = getSampleStyleSheet()
-body_style = ParagraphStyle(
-    name='Body',
-    parent=styles['BodyText'],
-    fontName='Helvetica',
-    fontSize=12,
-    leading=16,
-    textColor=text_color,
-    allowWidows=1,
-    allowOrphans=1
-)
-just_style = ParagraphStyle(
-    name='Justification',
-    parent=body_style,
-    fontSize=10,
-    leading=14
-)
-
-def generate_pdf(logo_path, client_name, claim_text, estimate_data):
-    # ensure output directory
-    out_dir = "finalized_pdfs"
-    os.makedirs(out_dir, exist_ok=True)
-    # consistently name the PDF path
-    pdf_path = os.path.join(
-        out_dir,
-        f"{client_name.replace(' ','_')}_Claim.pdf"
+@lru_cache(maxsize=None)
+def _styles():
+    # Built on first render, not at import: the sample sheet isn't free
+    styles     = getSampleStyleSheet()
+    body_style = ParagraphStyle(
+        name='Body',
+        parent=styles['BodyText'],
+        fontName='Helvetica',
+        fontSize=12,
+        leading=16,
+        textColor=text_color,
+        allowWidows=1,
+        allowOrphans=1
+    )
+    just_style = ParagraphStyle(
+        name='Justification',
+        parent=body_style,
+        fontSize=10,
+        leading=14
     )
+    return body_style, just_style
+
+def _escape(text):
+    # Plain text -> Paragraph markup, keeping tabs and line breaks
+    esc = saxutils.escape(text)
+    return esc.replace('\t','&nbsp;'*4).replace('\r\n','\n').replace('\n','<br/>')
+
+class _Stack:
+    """Wrapped paragraphs drawn top to bottom as one table cell."""
 
-    c = canvas.Canvas(pdf_path, pagesize=LETTER)
+    def __init__(self, parts):
+        self.parts = parts      # [(Paragraph or None for a blank line, height)]
+
+    def drawOn(self, canv, x, y):
+        top = y + sum(h for _, h in self.parts)
+        for para, h in self.parts:
+            top -= h
+            if para is not None:
+                para.drawOn(canv, x, top)
+
+def generate_pdf(logo_path, client_name, claim_text, estimate_data,
+                 output=None, key=None):
+    # Without a file object, write atomically into artifact storage
+    if output is None:
+        key = key or artifact_key(client_name, "pdf")
+        with get_storage().open_write(key) as fh:
+            generate_pdf(logo_path, client_name, claim_text, estimate_data, output=fh)
+        return key
+
+    estimate = as_estimate(estimate_data)
+    body_style, just_style = _styles()
+    c = canvas.Canvas(output, pagesize=LETTER)
     width, height = LETTER
 
+    # Logo goes into a form XObject once; every page just references it
+    try:
+        logo = get_image(logo_path)
+    except OSError:
+        logo = None
+    if logo is not None:
+        c.beginForm("logo")
+        c.drawImage(logo.reader, 0.5*inch, height - 1.4*inch,
+                    width=3.2*inch, height=1.2*inch,
+                    preserveAspectRatio=True)
+        c.endForm()
+
     # Helpers:
+    def draw_logo():
+        if logo is not None:
+            c.doForm("logo")
+
     def start_contents_page(include_title: bool):
         c.setFillColor(bg_color)
         c.rect(0, 0, width, height, fill=1, stroke=0)
         c.setFillColor(text_color)
-        try:
-            img = ImageReader(logo_path)
-            c.drawImage(img, 0.5*inch, height - 1.4*inch,
-                        width=3.2*inch, height=1.2*inch,
-                        preserveAspectRatio=True)
-        except:
-            pass
+        draw_logo()
         if include_title:
             c.setFont("Helvetica-Bold", 20)
             # half-inch below logo (logo bottom ~1.4")
@@ -72,99 +112,224 @@ def generate_pdf(logo_path, client_name, claim_text, estimate_data):
         c.line(inch, y2, width - inch, y2)
         return y2 - 0.2*inch
 
+    def draw_summary_headers(y_pos):
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(inch,              y_pos, "Category")
+        c.drawRightString(5.4*inch,     y_pos, "Items")
+        c.drawRightString(total_x,      y_pos, "Subtotal")
+        y2 = y_pos - 0.15*inch
+        c.line(inch, y2, width - inch, y2)
+
+    def draw_footer(page_no, page_count):
+        c.setFont("Helvetica", 9)
+        c.drawCentredString(width/2, 0.5*inch, f"Page {page_no} of {page_count}")
+
+    # Layout constants
+    cat_x, cat_w = inch, 2*inch
+    just_x       = cat_x + cat_w + 0.2*inch
+    total_x      = 7.4*inch
+    just_w       = (total_x - 1.0*inch) - just_x
+    bottom_margin= inch
+    header_h     = 0.5*inch     # table headers + rule
+    summary_row_h= 0.25*inch
+    cont_top     = height - 1.9*inch    # content 0.5" below logo on later pages
+
+    # === LAYOUT PRE-PASS ===
+    # Wrap each distinct (text, width) once: categories repeat on most rows,
+    # and a wrapped Paragraph can be drawn any number of times.
+    wrapped = {}
+
+    def layout(text, cell_w):
+        hit = wrapped.get((text, cell_w))
+        if hit is None:
+            para = Paragraph(_escape(text), just_style)
+            _, h = para.wrap(cell_w, height)
+            hit = wrapped[(text, cell_w)] = (para, h)
+        return hit
+
+    # Then place everything, so the page count is known before drawing
+    # anything. Each page is a list of (op, y, *args).
+    pages = [[]]
+    y = height - 3.2*inch - 6*0.3*inch - 0.9*inch   # below metadata + grand total
+
+    def new_page():
+        pages.append([])
+        return cont_top
+
+    def new_table_page():
+        y = new_page()
+        pages[-1].append(("headers", y))
+        return y - header_h
+
+    page_room = cont_top - header_h - bottom_margin   # tallest row a fresh page holds
+    min_split = 2 * just_style.leading                # don't strand a lone line
+
+    def split_row(y, category, cat_para, h_cat, just, row_total):
+        """Place a justification taller than a page as one piece per page.
+
+        Breaks fall between hard lines where possible (they wrap
+        independently); platypus split is only used on a single line that
+        is taller than the room left. Each split happens once, here; the draw
+        pass just replays the pieces. Later pieces repeat the category with a
+        "(continued)" marker.
+        """
+        # (para, height, memoized?) per hard line; None for a blank line
+        lines = deque(
+            (*layout(line, just_w), True) if line.strip() else (None, just_style.leading, False)
+            for line in just.replace('\r\n', '\n').split('\n')
+        )
+        while lines and lines[-1][0] is None:
+            lines.pop()
+        first = True
+        piece, piece_h = [], 0
+
+        def place(y):
+            nonlocal first
+            # 14 (not the piece height) keeps the total level with the first line
+            pages[-1].append(("row", y, cat_para, h_cat, _Stack(piece), piece_h, 14,
+                              row_total if first else None))
+            first = False
+
+        while lines:
+            avail = y - bottom_margin
+            para, h, shared = lines[0]
+            if piece_h + h <= avail:
+                piece.append((para, h))
+                piece_h += h
+                lines.popleft()
+                continue
+            room = avail - piece_h
+            if para is not None and room >= min_split:
+                if shared:
+                    # Split a private copy: the memoized Paragraph may be drawn elsewhere
+                    para = Paragraph(para.text, just_style)
+                    para.wrap(just_w, height)
+                parts = para.split(just_w, room)
+                if len(parts) == 2:
+                    head, tail = parts
+                    piece.append((head, head.wrap(just_w, room)[1]))
+                    piece_h += piece[-1][1]
+                    lines[0] = (tail, tail.wrap(just_w, height)[1], False)
+            if not piece and avail >= page_room:
+                # unsplittable even on an empty page: draw it as is
+                piece.append((para, h))
+                piece_h += h
+                lines.popleft()
+            if piece:
+                place(y)
+                piece, piece_h = [], 0
+            y = new_table_page()
+            if not first:
+                cat_para, h_cat = layout(f"{category} (continued)", cat_w)
+                while lines and lines[0][0] is None:
+                    lines.popleft()     # no blank lines at the top of a page
+
+        if piece:
+            place(y)
+        return y - (max(h_cat, piece_h, 14) + 6)
+
+    pages[-1].append(("headers", y))
+    y -= header_h
+    for category, just, row_total in estimate.rows():
+        cat_para, h_cat = layout(category, cat_w)
+        just_para, h_just = layout(just, just_w)
+        row_h = max(h_cat, h_just, 14)
+        if y - row_h < bottom_margin:
+            if row_h > page_room:
+                y = split_row(y, category, cat_para, h_cat, just, row_total)
+                continue
+            y = new_table_page()
+        pages[-1].append(("row", y, cat_para, h_cat, just_para, h_just, row_h, row_total))
+        y -= (row_h + 6)
+
+    # Category subtotals
+    if y - (0.9*inch + summary_row_h) < bottom_margin:
+        y = new_page()
+    else:
+        y -= 0.3*inch
+    pages[-1].append(("summary_title", y))
+    y -= 0.35*inch
+    pages[-1].append(("summary_headers", y))
+    y -= 0.4*inch
+    for category, count, subtotal in estimate.summary():
+        if y - summary_row_h < bottom_margin:
+            y = new_page()
+            pages[-1].append(("summary_headers", y))
+            y -= 0.4*inch
+        pages[-1].append(("summary_row", y, category, count, subtotal))
+        y -= summary_row_h
+
+    page_count = 1 + len(pages)
+
     # === PAGE 1: Claim Package ===
     c.setFillColor(bg_color); c.rect(0, 0, width, height, fill=1, stroke=0)
     c.setFillColor(text_color)
-    try:
-        img = ImageReader(logo_path)
-        c.drawImage(img, 0.5*inch, height - 1.4*inch,
-                    width=3.2*inch, height=1.2*inch, preserveAspectRatio=True)
-    except:
-        pass
+    draw_logo()
 
     c.setFont("Helvetica-Bold", 20)
     c.drawCentredString(width/2, height - 2.5*inch, "Claim Package")
 
-    raw = claim_text or ""
-    esc = saxutils.escape(raw).replace('\t','&nbsp;'*4).replace('\r\n','\n').replace('\n','<br/>')
-    para = Paragraph(esc, body_style)
+    para = Paragraph(_escape(claim_text or ""), body_style)
     avail_w = width - 2*inch
     avail_h = height - 3*inch
     _, h = para.wrap(avail_w, avail_h)
     para.drawOn(c, inch, height - 3*inch - h)
 
+    draw_footer(1, page_count)
     c.showPage()
 
     # === PAGE 2+: Contents Estimate ===
-    start_contents_page(include_title=True)
+    for page_no, ops in enumerate(pages, start=2):
+        start_contents_page(include_title=(page_no == 2))
 
-    # Metadata
-    y = height - 3.2*inch
-    for label in ["claimant","property","estimator","estimate_type","date_entered","date_completed"]:
-        label_text = f"{label.replace('_',' ').title()}: "
-        val        = estimate_data.get(label, "")
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(inch, y, label_text)
-        lw = c.stringWidth(label_text, "Helvetica-Bold", 12)
-        c.setFont("Helvetica", 12)
-        c.drawString(inch + lw, y, val)
-        y -= 0.3*inch
+        if page_no == 2:
+            # Metadata
+            y = height - 3.2*inch
+            for label in ["claimant","property","estimator","estimate_type","date_entered","date_completed"]:
+                label_text = f"{label.replace('_',' ').title()}: "
+                val        = estimate.get(label, "")
+                c.setFont("Helvetica-Bold", 12)
+                c.drawString(inch, y, label_text)
+                lw = c.stringWidth(label_text, "Helvetica-Bold", 12)
+                c.setFont("Helvetica", 12)
+                c.drawString(inch + lw, y, val)
+                y -= 0.3*inch
 
-    # Grand total
-    y -= 0.3*inch
-    total_sum = sum(r.get("total",0) for r in estimate_data.get("rows",[]))
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(width/2, y, f"Total Replacement Cost Value: ${total_sum:,.2f}")
-    y -= 0.6*inch
+            # Grand total
+            y -= 0.3*inch
+            c.setFont("Helvetica-Bold", 16)
+            c.drawCentredString(width/2, y, f"Total Replacement Cost Value: ${estimate.grand_total:,.2f}")
 
-    # Initial table headers
-    y = draw_table_headers(y)
+        for op, y, *args in ops:
+            if op == "row":
+                cat_para, h_cat, just_para, h_just, row_h, row_total = args
+                cat_para.drawOn(c,  cat_x,   y - h_cat)
+                just_para.drawOn(c, just_x,  y - h_just)
+                if row_total is not None:      # None on continued pieces of a split row
+                    c.setFont("Helvetica", 10)
+                    c.drawRightString(total_x,
+                                      y - (row_h/2) + 4,
+                                      f"${row_total:,.2f}")
+            elif op == "headers":
+                draw_table_headers(y)
+            elif op == "summary_title":
+                c.setFont("Helvetica-Bold", 14)
+                c.drawString(inch, y, "Category Subtotals")
+            elif op == "summary_headers":
+                draw_summary_headers(y)
+            elif op == "summary_row":
+                category, count, subtotal = args
+                c.setFont("Helvetica", 10)
+                label = category
+                while len(label) > 1 and c.stringWidth(label, "Helvetica", 10) > 3.8*inch:
+                    label = label[:-2] + "…"
+                c.drawString(inch, y, label)
+                c.drawRightString(5.4*inch, y, f"{count:,}")
+                c.drawRightString(total_x,  y, f"${subtotal:,.2f}")
 
-    # Layout constants
-    cat_x, cat_w = inch, 2*inch
-    just_x       = cat_x + cat_w + 0.2*inch
-    total_x      = 7.4*inch
-    just_w       = (total_x - 1.0*inch) - just_x
-    bottom_margin= inch
-
-    # Rows
-    for row in estimate_data.get("rows", []):
-        avail_h = y - bottom_margin
-
-        cat_para  = Paragraph(row.get("category","—"), just_style)
-        raw_j     = row.get("justification","—")
-        esc_j     = saxutils.escape(raw_j).replace('\t','&nbsp;'*4).replace('\r\n','\n').replace('\n','<br/>')
-        just_para = Paragraph(esc_j, just_style)
-
-        w_cat, h_cat   = cat_para.wrap(cat_w,    avail_h)
-        w_just, h_just = just_para.wrap(just_w, avail_h)
-        row_h = max(h_cat, h_just, 14)
-
-        if y - row_h < bottom_margin:
-            c.showPage()
-            start_contents_page(include_title=False)
-            y = height - 1.9*inch    # headers 0.5" below logo
-            y = draw_table_headers(y)
-            avail_h = y - bottom_margin
-
-        cat_para.drawOn(c,  cat_x,   y - h_cat)
-        just_para.drawOn(c, just_x,  y - h_just)
-        c.setFont("Helvetica", 10)
-        c.drawRightString(total_x,
-                          y - (row_h/2) + 4,
-                          f"${row.get('total',0):,.2f}")
-        y -= (row_h + 6)
+        draw_footer(page_no, page_count)
+        c.showPage()
 
     c.save()
 
-    # Generate Excel beside the PDF
-    excel_path = generate_excel(
-        pdf_path,
-        logo_path=logo_path,
-        claim_text=claim_text,
-        estimate_data=estimate_data,
-        client_name=client_name
-    )
-
-    return pdf_path, excel_path
-
+    return output
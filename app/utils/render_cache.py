@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from .render_pipeline import FORMATS, TEMPLATE_VERSION, RenderResult
+from .storage import artifact_key, get_storage
+
+# Shared, content-addressed renders live under this prefix in artifact storage
+RENDER_CACHE_PREFIX = "cache"
+# Least recently used artifacts are deleted once the cache grows past this;
+# 0 disables sharing and every record gets its own artifacts
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_MB", "5120")) * 1024 * 1024
+# Listing the cache (paginated LISTs on S3) happens only when this process's
+# running total says it is over budget, or this often to catch up with what
+# other processes wrote
+RENDER_CACHE_SCAN_SECONDS = float(os.getenv("RENDER_CACHE_SCAN_SECONDS", "300"))
+
+# Once over budget, evict down to this fraction of it, so a full cache isn't
+# listed again on the very next render
+EVICT_TO = 0.9
+
+_lock = threading.Lock()
+_known_bytes = None     # size at the last listing + what this process wrote since
+_scanned_at = 0.0
+
+
+def enabled() -> bool:
+    return RENDER_CACHE_MAX_BYTES > 0
+
+
+def cache_key(claim_text: str, estimate_data: dict) -> str:
+    """Canonical hash of everything that affects the rendered output."""
+    canonical = json.dumps(
+        {"template": TEMPLATE_VERSION, "claim_text": claim_text, "estimate": estimate_data},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _entry_key(key: str, fmt: str) -> str:
+    return f"{RENDER_CACHE_PREFIX}/{key[:2]}/{key}.{fmt}"
+
+
+def destination_keys(key: str, record_id: str, client_name: str) -> Dict[str, str]:
+    """Storage keys a fresh render for this record should be written to."""
+    if enabled():
+        return {fmt: _entry_key(key, fmt) for fmt in FORMATS}
+    return {fmt: artifact_key(client_name, fmt, record_id) for fmt in FORMATS}
+
+
+def lookup(key: str, formats: Iterable[str] = FORMATS) -> Optional[Dict[str, str]]:
+    """Return {format: storage key} if every requested format is cached, else None."""
+    if not enabled():
+        return None
+    storage = get_storage()
+    keys = {fmt: _entry_key(key, fmt) for fmt in formats}
+    if not all(storage.exists(entry) for entry in keys.values()):
+        return None
+    for entry in keys.values():
+        storage.touch(entry)    # mark as recently used for eviction
+    return keys
+
+
+def store(result: RenderResult, keys: Dict[str, str]) -> Dict[str, str]:
+    """Write in-memory artifacts to storage and return their keys."""
+    storage = get_storage()
+    for fmt, artifact in result.artifacts.items():
+        if artifact.data is not None:
+            storage.put_bytes(keys[fmt], artifact.data)
+            artifact.key = keys[fmt]
+    if enabled():
+        evict_if_needed(result.total_bytes)
+    return {fmt: a.key for fmt, a in result.artifacts.items()}
+
+
+def evict_if_needed(written: int) -> int:
+    """Count freshly written bytes; evict() only if that may break the budget.
+
+    Returns the number of bytes freed.
+    """
+    global _known_bytes
+    with _lock:
+        if _known_bytes is not None:
+            _known_bytes += written
+        due = (_known_bytes is None or _known_bytes > RENDER_CACHE_MAX_BYTES
+               or time.monotonic() - _scanned_at >= RENDER_CACHE_SCAN_SECONDS)
+    return evict() if due else 0
+
+
+def evict(max_bytes: int = None) -> int:
+    """Delete least recently used artifacts until the cache is back under
+    EVICT_TO of its budget (when it is over the budget at all).
+
+    Lists the whole cache; renders go through evict_if_needed() instead.
+    Returns the number of bytes freed.
+    """
+    global _known_bytes, _scanned_at
+    if max_bytes is None:
+        max_bytes = RENDER_CACHE_MAX_BYTES
+    storage = get_storage()
+    entries = list(storage.list(RENDER_CACHE_PREFIX + "/"))
+    total = sum(e.size for e in entries)
+
+    freed = 0
+    if total > max_bytes:
+        target = max_bytes * EVICT_TO
+        for entry in sorted(entries, key=lambda e: e.mtime):
+            storage.delete(entry.key)
+            freed += entry.size
+            if total - freed <= target:
+                break
+    with _lock:
+        _known_bytes, _scanned_at = total - freed, time.monotonic()
+    return freed
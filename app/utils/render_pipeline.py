@@ -0,0 +1,108 @@
+import time
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Union
+
+from .estimate_model import Estimate, as_estimate
+from .storage import get_storage
+
+PDF = "pdf"
+XLSX = "xlsx"
+FORMATS = (PDF, XLSX)
+
+# Bump whenever the PDF/XLSX layout changes, so cached renders are not reused
+TEMPLATE_VERSION = "4"     # 4: oversized rows split across pages
+
+
+@dataclass
+class RenderedArtifact:
+    format: str
+    key: Optional[str]              # storage key
+    seconds: float
+    size: int
+    data: Optional[bytes] = None    # set instead of key for in-memory renders
+
+
+@dataclass
+class RenderResult:
+    artifacts: Dict[str, RenderedArtifact] = field(default_factory=dict)
+    rows: int = 0       # estimate line items, for metrics
+
+    @property
+    def pdf_key(self):
+        art = self.artifacts.get(PDF)
+        return art.key if art else None
+
+    @property
+    def excel_key(self):
+        art = self.artifacts.get(XLSX)
+        return art.key if art else None
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(a.seconds for a in self.artifacts.values())
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(a.size for a in self.artifacts.values())
+
+
+def _render_one(fmt, output, logo_path, client_name, claim_text, estimate_data):
+    # The generators pull in reportlab/xlsxwriter; only processes that
+    # actually render pay for importing them
+    if fmt == PDF:
+        from .pdf_generator import generate_pdf
+        generate_pdf(
+            logo_path=logo_path,
+            client_name=client_name,
+            claim_text=claim_text,
+            estimate_data=estimate_data,
+            output=output
+        )
+    else:
+        from .excel_generator import generate_excel
+        generate_excel(
+            logo_path=logo_path,
+            claim_text=claim_text,
+            estimate_data=estimate_data,
+            client_name=client_name,
+            output=output
+        )
+
+
+def render_claim(logo_path: str,
+                 client_name: str,
+                 claim_text: str,
+                 estimate_data: Union[dict, Estimate],
+                 formats: Iterable[str] = FORMATS,
+                 keys: Optional[Dict[str, str]] = None) -> RenderResult:
+    """Render each requested format exactly once and time it.
+
+    This is the only place the generators should be called from; use
+    ``formats=("pdf",)`` or ``formats=("xlsx",)`` to render just one.
+    Artifacts are written atomically to storage at ``keys[format]``; with
+    ``keys=None`` nothing touches disk and each artifact carries its bytes
+    in ``data`` instead. Row dicts are converted to an Estimate once and
+    shared by every format.
+    """
+    formats = tuple(dict.fromkeys(formats))
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown render format(s): {', '.join(sorted(unknown))}")
+
+    estimate_data = as_estimate(estimate_data)
+    result = RenderResult(rows=len(estimate_data))
+    for fmt in formats:
+        start = time.perf_counter()
+        if keys is None:
+            output = BytesIO()
+            _render_one(fmt, output, logo_path, client_name, claim_text, estimate_data)
+            data = output.getvalue()
+            artifact = RenderedArtifact(fmt, None, time.perf_counter() - start, len(data), data)
+        else:
+            with get_storage().open_write(keys[fmt]) as fh:
+                _render_one(fmt, fh, logo_path, client_name, claim_text, estimate_data)
+                size = fh.tell()
+            artifact = RenderedArtifact(fmt, keys[fmt], time.perf_counter() - start, size)
+        result.artifacts[fmt] = artifact
+    return result
@@ -0,0 +1,334 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal, engine
+from app.models import user_model, client_addition, claim_model  # noqa: F401  (register mappers)
+from app.models.file_model import (
+    FileRecord, RENDER_QUEUED, RENDER_RENDERING, RENDER_DONE, RENDER_FAILED
+)
+from app.utils import metrics
+
+log = logging.getLogger(__name__)
+
+# Worker processes doing the ReportLab/xlsxwriter work
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+# Jobs allowed to wait for a worker before /finalize starts refusing work
+RENDER_QUEUE_LIMIT = int(os.getenv("RENDER_QUEUE_LIMIT", "64"))
+# The process that queued a render refreshes its render_heartbeat_at this
+# often; a queued/rendering record whose heartbeat is older than
+# RENDER_STALE_SECONDS lost its process and is queued again (see recover_stale)
+RENDER_HEARTBEAT_SECONDS = float(os.getenv("RENDER_HEARTBEAT_SECONDS", "10"))
+RENDER_STALE_SECONDS = float(os.getenv("RENDER_STALE_SECONDS", "60"))
+
+
+# render_error of jobs dropped by shutdown(); recover_stale picks them up again
+SHUTDOWN_ERROR = "Cancelled: server shut down before rendering"
+
+
+class RenderQueueFull(Exception):
+    """Raised when RENDER_QUEUE_LIMIT jobs are already queued or rendering."""
+
+
+_executor = None
+_futures = {}                 # job_id -> Future, for jobs submitted by this process
+_reserved = set()             # job ids holding a slot between reserve() and submit
+_lock = threading.Lock()
+
+
+def _init_worker():
+    # Never share pooled connections with the parent process
+    engine.dispose(close=False)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def _reset_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _render_job(job_id: str, content_hash: str, logo_path: str,
+                client_name: str, claim_text: str, estimate_data: dict):
+    """Runs in a worker process: render both artifacts and update the record."""
+    from app.utils import render_cache
+    from app.utils.render_pipeline import render_claim, PDF, XLSX
+
+    db = SessionLocal()
+    try:
+        record = db.get(FileRecord, job_id)
+        if record is None:
+            return None
+        record.render_status = RENDER_RENDERING
+        record.started_at = datetime.utcnow()
+        db.commit()
+
+        result = None
+        try:
+            # An identical submission may have finished while this one queued
+            keys = render_cache.lookup(content_hash)
+            if keys is None:
+                keys = render_cache.destination_keys(content_hash, job_id, client_name)
+                result = render_claim(
+                    logo_path=logo_path,
+                    client_name=client_name,
+                    claim_text=claim_text,
+                    estimate_data=estimate_data,
+                    keys=keys
+                )
+                if render_cache.enabled():
+                    render_cache.evict_if_needed(result.total_bytes)
+        except Exception as e:
+            record.render_status = RENDER_FAILED
+            record.render_error = f"{type(e).__name__}: {e}"
+            record.finished_at = datetime.utcnow()
+            db.commit()
+            raise
+
+        record.file_path = keys[PDF]
+        record.pdf_path = keys[PDF]
+        record.excel_path = keys[XLSX]
+        record.render_status = RENDER_DONE
+        record.render_error = None
+        record.finished_at = datetime.utcnow()
+        db.commit()
+        return result
+    finally:
+        db.close()
+
+
+def _render_in_memory(logo_path: str, client_name: str,
+                      claim_text: str, estimate_data: dict):
+    """Runs in a worker process: render both artifacts to bytes, no disk or DB."""
+    from app.utils.render_pipeline import render_claim
+
+    return render_claim(
+        logo_path=logo_path,
+        client_name=client_name,
+        claim_text=claim_text,
+        estimate_data=estimate_data,
+        keys=None
+    )
+
+
+def _mark_failed(job_id: str, error: str) -> None:
+    db = SessionLocal()
+    try:
+        record = db.get(FileRecord, job_id)
+        if record is not None and record.render_status in (RENDER_QUEUED, RENDER_RENDERING):
+            record.render_status = RENDER_FAILED
+            record.render_error = error
+            record.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+
+def _job_finished(job_id, future):
+    with _lock:
+        _futures.pop(job_id, None)
+    if future.cancelled():
+        # shutdown(wait=False) drops jobs that never started; exception()
+        # would raise CancelledError here and leave them queued forever
+        log.warning("Render job %s cancelled at shutdown", job_id)
+        _mark_failed(job_id, SHUTDOWN_ERROR)
+        return
+    exc = future.exception()
+    if exc is None:
+        result = future.result()
+        if result is not None:
+            metrics.record_render(result)
+            log.info("Render job %s: %s", job_id, ", ".join(
+                f"{a.format} {a.size} bytes in {a.seconds:.3f}s"
+                for a in result.artifacts.values()
+            ))
+        return
+    log.error("Render job %s failed: %s", job_id, exc)
+
+    # A crashed worker (BrokenProcessPool) never got to record the failure
+    _mark_failed(job_id, f"{type(exc).__name__}: {exc}")
+
+
+def reserve(job_id: str) -> None:
+    """Hold a queue slot for job_id before anything is committed for it.
+
+    Raises RenderQueueFull, so callers can refuse work without leaving
+    rows behind; submit()/render_in_memory() for job_id use the slot, and
+    release() frees it if the job is never submitted.
+    """
+    with _lock:
+        if len(_futures) + len(_reserved) >= RENDER_QUEUE_LIMIT:
+            raise RenderQueueFull(f"{len(_futures) + len(_reserved)} render jobs already pending")
+        _reserved.add(job_id)
+
+
+def release(job_id: str) -> None:
+    """Free an unused reserve() slot; a no-op once the job was submitted."""
+    with _lock:
+        _reserved.discard(job_id)
+
+
+def _submit(job_id, fn, *args):
+    with _lock:
+        if job_id in _reserved:
+            _reserved.discard(job_id)
+        elif len(_futures) + len(_reserved) >= RENDER_QUEUE_LIMIT:
+            raise RenderQueueFull(f"{len(_futures) + len(_reserved)} render jobs already pending")
+        try:
+            future = _get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died earlier; start a fresh pool rather than failing forever
+            _reset_executor()
+            future = _get_executor().submit(fn, *args)
+        _futures[job_id] = future
+    future.add_done_callback(lambda f: _job_finished(job_id, f))
+    return future
+
+
+def submit(job_id: str, *, content_hash: str, logo_path: str,
+           client_name: str, claim_text: str, estimate_data: dict) -> None:
+    """Queue a render for an already-committed FileRecord (status "queued")."""
+    _submit(job_id, _render_job, job_id, content_hash, logo_path,
+            client_name, claim_text, estimate_data)
+
+
+async def render_in_memory(job_id: str, *, logo_path: str, client_name: str,
+                           claim_text: str, estimate_data: dict):
+    """Render on the pool and return the RenderResult with artifact bytes.
+
+    Shares the pool and RENDER_QUEUE_LIMIT with submit(); the caller owns
+    the FileRecord and persisting the artifacts.
+    """
+    future = _submit(job_id, _render_in_memory, logo_path,
+                     client_name, claim_text, estimate_data)
+    return await asyncio.wrap_future(future)
+
+
+def pending() -> int:
+    with _lock:
+        return len(_futures) + len(_reserved)
+
+
+async def wait_for(job_id: str, timeout: float) -> bool:
+    """Wait (without blocking the event loop) for a job submitted by this process.
+
+    Returns False straight away if the job is not tracked here (another
+    uvicorn worker queued it, or it already finished), so callers fall back
+    to polling the FileRecord. Otherwise returns True on completion, failure
+    or timeout; callers re-read the FileRecord for the outcome.
+    """
+    with _lock:
+        future = _futures.get(job_id)
+    if future is None:
+        return False
+    try:
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+    except Exception:
+        pass
+    return True
+
+
+def shutdown(wait: bool = True) -> None:
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=not wait)
+            _executor = None
+
+
+def heartbeat() -> int:
+    """Mark this process's pending jobs as alive; returns how many."""
+    from sqlalchemy import update
+
+    with _lock:
+        job_ids = list(_futures) + list(_reserved)
+    if not job_ids:
+        return 0
+    db = SessionLocal()
+    try:
+        for i in range(0, len(job_ids), 500):
+            db.execute(update(FileRecord)
+                       .where(FileRecord.id.in_(job_ids[i:i + 500]))
+                       .values(render_heartbeat_at=datetime.utcnow()))
+        db.commit()
+    finally:
+        db.close()
+    return len(job_ids)
+
+
+def recover_stale(logo_path: str, max_age: float = RENDER_STALE_SECONDS) -> dict:
+    """Queue again any render whose process stopped sending heartbeats.
+
+    Runs at startup and then every RENDER_HEARTBEAT_SECONDS (see
+    app.main). Jobs cancelled by a shutdown count as stale straight away.
+    Each stale record is claimed with a conditional UPDATE, so with
+    several uvicorn workers only one of them requeues it. When the queue
+    is full the rest wait for the next pass.
+    """
+    from sqlalchemy import and_, or_, select, update
+    from app.utils import claims, render_cache
+
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+    is_stale = or_(
+        and_(FileRecord.render_status.in_((RENDER_QUEUED, RENDER_RENDERING)),
+             or_(FileRecord.render_heartbeat_at.is_(None),
+                 FileRecord.render_heartbeat_at < cutoff)),
+        and_(FileRecord.render_status == RENDER_FAILED,
+             FileRecord.render_error == SHUTDOWN_ERROR),
+    )
+    counts = {"requeued": 0, "failed": 0}
+    db = SessionLocal()
+    try:
+        stale = db.execute(
+            select(FileRecord.id, FileRecord.client_name).where(is_stale)
+        ).all()
+        for job_id, client_name in stale:
+            loaded = claims.load_claim(db, job_id)
+            claimed = update(FileRecord).where(FileRecord.id == job_id, is_stale)
+            if loaded is None:
+                claimed = claimed.values(
+                    render_status=RENDER_FAILED, finished_at=datetime.utcnow(),
+                    render_error="Interrupted by a restart; no stored claim to render again")
+            else:
+                try:
+                    reserve(job_id)
+                except RenderQueueFull:
+                    break
+                claim_text, estimate = loaded
+                content_hash = render_cache.cache_key(claim_text, estimate.to_dict())
+                now = datetime.utcnow()
+                claimed = claimed.values(
+                    render_status=RENDER_QUEUED, render_error=None, content_hash=content_hash,
+                    queued_at=now, render_heartbeat_at=now, started_at=None, finished_at=None)
+            try:
+                if db.execute(claimed).rowcount != 1:
+                    db.rollback()       # another worker got there first
+                    continue
+                db.commit()
+                if loaded is None:
+                    counts["failed"] += 1
+                    continue
+                submit(job_id, content_hash=content_hash, logo_path=logo_path,
+                       client_name=client_name, claim_text=claim_text, estimate_data=estimate)
+                counts["requeued"] += 1
+            finally:
+                release(job_id)
+    finally:
+        db.close()
+    return counts
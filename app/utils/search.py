@@ -0,0 +1,198 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.file_model import FileRecord
+from app.utils.claims import load_claim
+from app.utils.estimate_model import Estimate
+from app.utils.pagination import clamp_limit
+
+log = logging.getLogger(__name__)
+
+# Justification text indexed per claim; Postgres caps a tsvector at 1MB
+MAX_INDEXED_CHARS = 200_000
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# SQLite: FTS5 table holding the searchable text, ranked with bm25().
+# Weights follow the column order: client name counts most, justifications least.
+_SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS claim_search USING fts5("
+    "record_id UNINDEXED, client_name, claimant, property, estimator, "
+    "claim_text, justifications, tokenize='porter unicode61')"
+)
+_SQLITE_INSERT = (
+    "INSERT INTO claim_search (record_id, client_name, claimant, property, estimator, "
+    "claim_text, justifications) VALUES (:record_id, :client_name, :claimant, :property, "
+    ":estimator, :claim_text, :justifications)"
+)
+_SQLITE_QUERY = (
+    "SELECT record_id, bm25(claim_search, 0, 10, 5, 5, 5, 2, 1) AS score, "
+    "snippet(claim_search, -1, '[', ']', '…', 12) AS snippet "
+    "FROM claim_search WHERE claim_search MATCH :q "
+    "ORDER BY score LIMIT :limit OFFSET :offset"
+)
+
+# Postgres: weighted tsvector per claim behind a GIN index
+_PG_DDL = (
+    "CREATE TABLE IF NOT EXISTS claim_search ("
+    "record_id VARCHAR PRIMARY KEY REFERENCES file_records(id), "
+    "document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_claim_search_document ON claim_search USING GIN (document)",
+)
+_PG_INSERT = (
+    "INSERT INTO claim_search (record_id, document) VALUES (:record_id, "
+    "setweight(to_tsvector('english', :client_name), 'A') || "
+    "setweight(to_tsvector('english', :people), 'B') || "
+    "setweight(to_tsvector('english', :claim_text), 'C') || "
+    "setweight(to_tsvector('english', :justifications), 'D')) "
+    "ON CONFLICT (record_id) DO UPDATE SET document = EXCLUDED.document"
+)
+_PG_QUERY = (
+    "SELECT s.record_id, ts_rank_cd(s.document, q) AS score, "
+    "ts_headline('english', coalesce(c.claim_text, ''), q, "
+    "'StartSel=[, StopSel=], MaxWords=24, MinWords=8') AS snippet "
+    "FROM claim_search s CROSS JOIN to_tsquery('english', :q) q "
+    "LEFT JOIN claims c ON c.id = s.record_id "
+    "WHERE s.document @@ q ORDER BY score DESC LIMIT :limit OFFSET :offset"
+)
+
+_available = {}   # database URL -> claim_search exists; checked once per process
+
+
+@dataclass
+class Hit:
+    record_id: str
+    score: float
+    snippet: Optional[str]
+
+
+def init_index(engine) -> None:
+    """Create the search index next to the ORM tables (see init_db)."""
+    dialect = engine.dialect.name
+    ddl = {"sqlite": (_SQLITE_DDL,), "postgresql": _PG_DDL}.get(dialect)
+    if ddl is None:
+        return
+    try:
+        with engine.begin() as conn:
+            for stmt in ddl:
+                conn.execute(text(stmt))
+    except OperationalError as e:
+        # e.g. an SQLite build without FTS5; /search then matches names only
+        log.warning("Full-text search unavailable: %s", e)
+        return
+    _available[_url(engine)] = True
+
+
+def _url(bind) -> str:
+    # The sync and async engines share a database but not an Engine object
+    url = bind.engine.url
+    return url.set(drivername=url.get_backend_name()).render_as_string(hide_password=True)
+
+
+def _dialect(db: Session) -> Optional[str]:
+    """The dialect to search with, or None when there is no claim_search table.
+
+    Looked up on first use rather than trusting init_index, which usually
+    ran in a separate `python -m app.migrate` process.
+    """
+    bind = db.get_bind()
+    name = bind.dialect.name
+    if name not in ("sqlite", "postgresql"):
+        return None
+    key = _url(bind)
+    available = _available.get(key)
+    if available is None:
+        available = _available[key] = inspect(db.connection()).has_table("claim_search")
+        if not available:
+            log.warning("No claim_search table; /search matches client names only "
+                        "until `python -m app.migrate` (then restart) creates it")
+    return name if available else None
+
+
+def index_claim(db: Session, record_id: str, client_name: str,
+                claim_text: str = "", estimate: Optional[Estimate] = None) -> None:
+    """Add a record to the index; caller commits.
+
+    Clients added without a claim (/admin/add-client) are indexed by name only.
+    """
+    dialect = _dialect(db)
+    if dialect is None:
+        return
+    if estimate is None:
+        estimate = Estimate()
+    # Distinct justifications only: boilerplate repeated on every row adds nothing
+    justifications = "\n".join(dict.fromkeys(j for j in estimate.justifications if j))
+    params = {
+        "record_id": record_id,
+        "client_name": client_name or "",
+        "claim_text": claim_text or "",
+        "justifications": justifications[:MAX_INDEXED_CHARS],
+    }
+    if dialect == "sqlite":
+        for key in ("claimant", "property", "estimator"):
+            params[key] = estimate.get(key) or ""
+        db.execute(text(_SQLITE_INSERT), params)
+    else:
+        params["people"] = " ".join(
+            estimate.get(key) or "" for key in ("claimant", "property", "estimator"))
+        db.execute(text(_PG_INSERT), params)
+
+
+def _match_query(q: str, dialect: str) -> Optional[str]:
+    # Words only, each as a prefix, all required; user input never reaches
+    # the FTS query parser as syntax
+    tokens = _TOKEN.findall(q)
+    if not tokens:
+        return None
+    if dialect == "sqlite":
+        return " ".join(f'"{t}"*' for t in tokens)
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def search(db: Session, q: str, limit: Optional[int] = None,
+           offset: int = 0) -> List[Hit]:
+    """Best matches first; returns up to limit + 1 hits so callers can tell
+    whether there is another page."""
+    limit = clamp_limit(limit)
+    dialect = _dialect(db)
+    if dialect is None:
+        return _search_names(db, q, limit, offset)
+    match = _match_query(q, dialect)
+    if match is None:
+        return []
+    rows = db.execute(text(_SQLITE_QUERY if dialect == "sqlite" else _PG_QUERY),
+                      {"q": match, "limit": limit + 1, "offset": offset})
+    # bm25() is lower-is-better; flip it so both backends rank high-to-low
+    sign = -1 if dialect == "sqlite" else 1
+    return [Hit(r.record_id, sign * r.score, r.snippet) for r in rows]
+
+
+def _search_names(db: Session, q: str, limit: int, offset: int) -> List[Hit]:
+    rows = db.query(FileRecord.id) \
+        .filter(FileRecord.client_name.icontains(q.strip(), autoescape=True)) \
+        .order_by(FileRecord.created_at.desc()).limit(limit + 1).offset(offset)
+    return [Hit(record_id, 0.0, None) for record_id, in rows]
+
+
+def reindex(db: Session) -> int:
+    """Rebuild the index from every record and its claim; returns records indexed."""
+    if _dialect(db) is None:
+        return 0
+    db.execute(text("DELETE FROM claim_search"))
+    count = 0
+    for record_id, client_name in db.query(FileRecord.id, FileRecord.client_name).all():
+        claim_text, estimate = load_claim(db, record_id) or ("", None)
+        index_claim(db, record_id, client_name, claim_text, estimate)
+        count += 1
+    return count
+
+
+def clear(db: Session) -> None:
+    if inspect(db.get_bind()).has_table("claim_search"):
+        db.execute(text("DELETE FROM claim_search"))
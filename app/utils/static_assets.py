@@ -0,0 +1,174 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:     # gzip only
+    brotli = None
+
+log = logging.getLogger(__name__)
+
+STATIC_DIR = "app/static"
+# Pre-compressed variants, named by content hash so stale builds never collide
+STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR", "static_build")
+
+# Already-compressed formats (jpg/png/woff2...) aren't worth a variant
+COMPRESSIBLE = {".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt",
+                ".html", ".xml", ".ico", ".ttf", ".otf", ".webmanifest"}
+MIN_SAVING = 0.05       # keep a variant only if it is at least 5% smaller
+
+IMMUTABLE = "public, max-age=31536000, immutable"    # fingerprinted URLs
+REVALIDATE = "public, no-cache"                      # plain names: check the ETag
+
+_ENCODERS = {"gzip": (".gz", lambda data: gzip.compress(data, 9, mtime=0))}
+if brotli is not None:
+    _ENCODERS["br"] = (".br", lambda data: brotli.compress(data, quality=11))
+
+
+@dataclass
+class Asset:
+    path: str               # relative to STATIC_DIR, '/'-separated
+    digest: str
+    source: str             # file on disk
+    media_type: str
+    variants: Dict[str, str] = field(default_factory=dict)    # encoding -> file
+
+    @property
+    def fingerprinted(self) -> str:
+        stem, ext = os.path.splitext(self.path)
+        return f"{stem}.{self.digest}{ext}"
+
+
+_lock = threading.Lock()
+_assets: Optional[Dict[str, Asset]] = None      # logical and fingerprinted path -> Asset
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def _variants(data: bytes, digest: str, ext: str, build_dir: str) -> Dict[str, str]:
+    variants = {}
+    for encoding, (suffix, encode) in _ENCODERS.items():
+        target = os.path.join(build_dir, f"{digest}{ext}{suffix}")
+        if not os.path.exists(target):
+            compressed = encode(data)
+            if len(compressed) > len(data) * (1 - MIN_SAVING):
+                continue
+            _write_atomic(target, compressed)
+        variants[encoding] = target
+    return variants
+
+
+def build(static_dir: str = STATIC_DIR, build_dir: str = STATIC_BUILD_DIR) -> Dict[str, Asset]:
+    """Fingerprint every file under static_dir and pre-compress the ones worth it.
+
+    Variants that already exist are reused, so this is cheap after the
+    first run; `python -m app.build_static` does it ahead of deploys.
+    """
+    global _assets
+    assets = {}
+    try:
+        os.makedirs(build_dir, exist_ok=True)
+        writable = True
+    except OSError as e:
+        log.warning("Static build dir %s unavailable (%s); serving uncompressed", build_dir, e)
+        writable = False
+
+    for dirpath, dirnames, filenames in os.walk(static_dir):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            if name.startswith("."):
+                continue
+            source = os.path.join(dirpath, name)
+            rel = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as fh:
+                data = fh.read()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            ext = os.path.splitext(name)[1].lower()
+            asset = Asset(rel, digest, os.path.abspath(source),
+                          mimetypes.guess_type(name)[0] or "application/octet-stream")
+            if writable and ext in COMPRESSIBLE:
+                asset.variants = _variants(data, digest, ext, build_dir)
+            assets[rel] = assets[asset.fingerprinted] = asset
+
+    with _lock:
+        _assets = assets
+    return assets
+
+
+def _get_assets() -> Dict[str, Asset]:
+    if _assets is None:
+        build()
+    return _assets
+
+
+def static_url(path: str) -> str:
+    """Jinja global: the fingerprinted URL for a file under app/static."""
+    asset = _get_assets().get(path.lstrip("/"))
+    return f"/static/{asset.fingerprinted if asset else path.lstrip('/')}"
+
+
+def _negotiate(accept_encoding: str, available: Dict[str, str]) -> Optional[str]:
+    # Honour q=0 refusals; otherwise prefer br over gzip
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class StaticAssets(StaticFiles):
+    """StaticFiles with pre-compressed variants, ETags and long-lived caching.
+
+    Fingerprinted URLs (static_url) are immutable for a year; plain names
+    still work but revalidate. Anything not in the asset map falls through
+    to StaticFiles.
+    """
+
+    async def get_response(self, path: str, scope) -> Response:
+        path = path.replace(os.sep, "/")
+        asset = _get_assets().get(path)
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        encoding = _negotiate(request_headers.get("accept-encoding", ""), asset.variants)
+        etag = f'"{asset.digest}-{encoding}"' if encoding else f'"{asset.digest}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE if path != asset.path else REVALIDATE,
+        }
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        if_none_match = request_headers.get("if-none-match", "")
+        if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return FileResponse(asset.variants.get(encoding, asset.source),
+                            media_type=asset.media_type, headers=headers)
@@ -0,0 +1,239 @@
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Iterator, Optional
+from uuid import uuid4
+
+# "local" (files under STORAGE_ROOT) or "s3" (any S3-compatible endpoint)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+STORAGE_ROOT = os.getenv("STORAGE_ROOT", "finalized_pdfs")
+
+_UNSAFE = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    mtime: float
+
+
+def artifact_key(client_name: str, fmt: str, artifact_id: str = None,
+                 when: datetime = None) -> str:
+    """Date/UUID-sharded key, e.g. 2025/05/01/<uuid>/Jane_Doe_Claim.pdf.
+
+    The UUID directory keeps two renders for the same client from ever
+    writing to the same object.
+    """
+    when = when or datetime.utcnow()
+    safe = _UNSAFE.sub("_", client_name).strip("._") or "claim"
+    return f"{when:%Y/%m/%d}/{artifact_id or uuid4()}/{safe}_Claim.{fmt}"
+
+
+class Storage:
+    """Where rendered artifacts live; keys are '/'-separated relative paths."""
+
+    def open_write(self, key: str):
+        """Context manager yielding a binary file; the object appears atomically on exit."""
+        raise NotImplementedError
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        with self.open_write(key) as fh:
+            fh.write(data)
+
+    def put_file(self, key: str, src_path: str) -> None:
+        """Store a local file, consuming (removing) it."""
+        with open(src_path, "rb") as src, self.open_write(key) as fh:
+            shutil.copyfileobj(src, fh)
+        os.remove(src_path)
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def touch(self, key: str) -> None:
+        """Mark an object as recently used (for LRU eviction)."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path for the object, if the backend has one."""
+        return None
+
+
+class LocalStorage(Storage):
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Storage key escapes the storage root: {key!r}")
+        return path
+
+    @contextmanager
+    def open_write(self, key: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Temp file in the same directory, so the rename is atomic
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                yield fh
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def put_file(self, key: str, src_path: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.replace(src_path, path)
+        except OSError:
+            # Different filesystem: fall back to copy + atomic rename
+            super().put_file(key, src_path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        try:
+            return os.path.isfile(self._path(key))
+        except ValueError:
+            return False
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self._path(key))
+
+    def touch(self, key: str) -> None:
+        os.utime(self._path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        base = self._path(prefix) if prefix else self.root
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                if name.startswith("."):
+                    continue    # in-flight temp file
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                yield StoredObject(key, st.st_size, st.st_mtime)
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+
+class S3Storage(Storage):
+    """S3-compatible backend.
+
+    ``client`` is anything with boto3's S3 client methods (upload_fileobj,
+    get_object, head_object, copy_object, delete_object and the
+    list_objects_v2 paginator), so MinIO or moto work as local stand-ins.
+    """
+
+    def __init__(self, client, bucket: str, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    @contextmanager
+    def open_write(self, key: str):
+        # S3 objects only become visible once the upload completes
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as fh:
+            yield fh
+            fh.seek(0)
+            self.client.upload_fileobj(fh, self.bucket, self._key(key))
+
+    def open(self, key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"]
+
+    def _head(self, key: str) -> Optional[dict]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            code = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def size(self, key: str) -> int:
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(key)
+        return head["ContentLength"]
+
+    def touch(self, key: str) -> None:
+        # Copying an object onto itself refreshes LastModified
+        self.client.copy_object(
+            Bucket=self.bucket, Key=self._key(key),
+            CopySource={"Bucket": self.bucket, "Key": self._key(key)},
+            MetadataDirective="REPLACE"
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            for obj in page.get("Contents", []):
+                yield StoredObject(
+                    obj["Key"][len(self.prefix):],
+                    obj["Size"],
+                    obj["LastModified"].timestamp()
+                )
+
+
+_storage = None
+
+
+def get_storage() -> Storage:
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "s3":
+            import boto3    # only needed for the S3 backend
+            client = boto3.client("s3", endpoint_url=os.getenv("S3_ENDPOINT_URL"))
+            _storage = S3Storage(client, os.environ["S3_BUCKET"], os.getenv("S3_PREFIX", ""))
+        else:
+            _storage = LocalStorage(STORAGE_ROOT)
+    return _storage
+
+
+def set_storage(storage: Storage) -> None:
+    """Swap the process-wide backend (e.g. for a local S3 stand-in)."""
+    global _storage
+    _storage = storage
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User
+
+# Seconds an authenticated user is trusted without re-reading the users table
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+
+_COLUMNS = [c.key for c in User.__table__.columns]
+
+_entries = OrderedDict()   # user id -> (expires_at, column values)
+_ids_by_email = {}         # email -> user id
+_lock = threading.Lock()
+hits = 0
+misses = 0
+
+
+def _snapshot(values: dict) -> User:
+    # A fresh, session-less copy: safe to hand to any request, never
+    # accidentally flushed. Load the row with db.get() before modifying it.
+    return User(**values)
+
+
+def _get(user_id: str) -> Optional[User]:
+    global hits
+    entry = _entries.get(user_id)
+    if entry is None:
+        return None
+    expires_at, values = entry
+    if expires_at < time.monotonic():
+        _drop(user_id)
+        return None
+    _entries.move_to_end(user_id)
+    hits += 1
+    return _snapshot(values)
+
+
+def _put(user: User) -> User:
+    global misses
+    values = {key: getattr(user, key) for key in _COLUMNS}
+    with _lock:
+        misses += 1
+        _drop(user.id)
+        _entries[user.id] = (time.monotonic() + USER_CACHE_TTL, values)
+        _ids_by_email[user.email] = user.id
+        while len(_entries) > USER_CACHE_SIZE:
+            old_id, (_, old) = _entries.popitem(last=False)
+            _ids_by_email.pop(old["email"], None)
+    return _snapshot(values)
+
+
+def _drop(user_id: str) -> None:
+    entry = _entries.pop(user_id, None)
+    if entry is not None:
+        _ids_by_email.pop(entry[1]["email"], None)
+
+
+def get_by_id(db: Session, user_id: str) -> Optional[User]:
+    with _lock:
+        user = _get(user_id)
+    if user is not None:
+        return user
+    user = db.query(User).filter(User.id == user_id).first()
+    return _put(user) if user else None
+
+
+def get_by_email(db: Session, email: str) -> Optional[User]:
+    with _lock:
+        user_id = _ids_by_email.get(email)
+        user = _get(user_id) if user_id else None
+    if user is not None:
+        return user
+    user = db.query(User).filter(User.email == email).first()
+    return _put(user) if user else None
+
+
+def invalidate(user_id: str = None, email: str = None) -> None:
+    with _lock:
+        if email is not None and user_id is None:
+            user_id = _ids_by_email.get(email)
+        if user_id is not None:
+            _drop(user_id)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+        _ids_by_email.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        return {"entries": len(_entries), "hits": hits, "misses": misses}
+
+
+# Any ORM write to a user (password change, new admin, deletion) evicts it.
+# Bulk query.delete() bypasses these hooks; callers must clear() themselves.
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    invalidate(user_id=target.id, email=target.email)
@@ -0,0 +1,4 @@
+"""Reproducible benchmarks for the PDF and Excel generators.
+
+Run from the repository root with ``python -m benchmarks``; see README.
+"""
@@ -0,0 +1,59 @@
+# Run as `python -m benchmarks` from the repository root
+import argparse
+import sys
+
+from . import runner
+
+# A scenario fails when its fastest run (or memory growth) exceeds its
+# baseline by more than this fraction (and, for time, by 25 ms or more)
+DEFAULT_THRESHOLD = 0.25
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time the PDF/XLSX generators on synthetic estimates.")
+    parser.add_argument("-k", dest="match", action="append", default=[],
+                        help="only scenarios whose name contains this (repeatable), e.g. -k pdf -k 1000")
+    parser.add_argument("--max-rows", type=int, help="skip larger estimates (e.g. 1000 for a quick run)")
+    parser.add_argument("--repeats", type=int, default=3, help="timed renders per scenario (default 3; fast ones repeat for ~1 s)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before failing (default 0.25 = 25%%)")
+    parser.add_argument("--save", action="store_true",
+                        help="store these results as the new baselines")
+    args = parser.parse_args(argv)
+
+    selected = [s for s in runner.scenarios(args.max_rows)
+                if all(m in s.name for m in args.match)]
+    if not selected:
+        parser.error("no scenarios match")
+
+    baselines = runner.load_baselines()
+    stored = (baselines or {}).get("scenarios", {})
+    if baselines and baselines.get("machine") != runner.machine():
+        print(f"note: baselines were recorded on {baselines.get('machine')}", file=sys.stderr)
+
+    print(f"{'scenario':<26}{'median s':>10}{'min s':>9}{'peak MB':>9}{'+MB':>7}{'bytes':>11}{'vs base':>9}")
+
+    def show(m):
+        base = stored.get(m.name)
+        change = f"{(m.seconds_min / base['seconds_min'] - 1) * 100:+.0f}%" if base else "-"
+        print(f"{m.name:<26}{m.seconds:>10.3f}{m.seconds_min:>9.3f}{m.peak_rss_mb:>9.1f}"
+              f"{m.rss_delta_mb:>7.1f}{m.bytes:>11,}{change:>9}", flush=True)
+
+    results = runner.run(selected, args.repeats, on_result=show)
+
+    if args.save:
+        runner.save_baselines(results)
+        print(f"Saved {len(results)} baselines to {runner.BASELINES_PATH}")
+        return 0
+    if baselines is None:
+        return 0
+    regressions = runner.compare(results, baselines, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import random
+
+# Seeded, so every run (and every machine) renders byte-for-byte the same input
+SEED = 20250501
+
+CATEGORIES = (
+    "Living Room", "Kitchen", "Primary Bedroom", "Bedroom 2", "Garage",
+    "Bathroom", "Office", "Lanai", "Laundry", "Dining Room", "Closet", "Storage",
+)
+WORDS = (
+    "water", "damage", "smoke", "replacement", "original", "receipt", "purchased",
+    "model", "brand", "condition", "cabinet", "television", "cookware", "sofa",
+    "mattress", "dresser", "lamp", "rug", "stained", "warped", "mold", "like",
+    "kind", "quality", "retail", "price", "estimate", "per", "vendor", "quote",
+)
+# Accented Latin, Hawaiian okina/kahako, CJK and emoji: the PDF fonts only
+# cover Latin-1, so this also exercises missing-glyph handling
+UNICODE_WORDS = (
+    "ʻohana", "lānai", "Kaʻanapali", "café", "naïve", "façade", "Müller",
+    "Ångström", "crème", "jalapeño", "東京", "食器", "🏠", "📺", "—", "½",
+)
+
+ROW_COUNTS = (10, 100, 1000, 10000)
+TEXT_KINDS = ("short", "paragraphs", "unicode")
+
+
+def _sentence(rng, words, n):
+    return " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+
+
+def justification(rng, kind: str) -> str:
+    if kind == "short":
+        return _sentence(rng, WORDS, rng.randint(3, 8))
+    if kind == "paragraphs":
+        # 2-4 paragraphs of a few sentences, separated by blank lines
+        return "\n\n".join(
+            " ".join(_sentence(rng, WORDS, rng.randint(6, 14)) for _ in range(rng.randint(2, 4)))
+            for _ in range(rng.randint(2, 4))
+        )
+    if kind == "unicode":
+        return _sentence(rng, WORDS + UNICODE_WORDS, rng.randint(4, 12))
+    raise ValueError(f"Unknown justification kind: {kind}")
+
+
+def estimate(rows: int, kind: str = "short", seed: int = SEED) -> dict:
+    """Estimate dict in the shape finalize_form builds."""
+    rng = random.Random(f"{seed}:{rows}:{kind}")
+    return {
+        "claimant": "Leilani Kahananui",
+        "property": "123 Honoapiʻilani Hwy, Lahaina" if kind == "unicode" else "123 Front St, Lahaina",
+        "estimator": "Benchmark",
+        "estimate_type": "Contents",
+        "date_entered": "2025-05-01",
+        "date_completed": "2025-05-02",
+        "rows": [
+            {
+                "category": rng.choice(CATEGORIES),
+                "justification": justification(rng, kind),
+                "total": round(rng.uniform(5, 5000), 2),
+            }
+            for _ in range(rows)
+        ],
+    }
+
+
+def claim_text(kind: str = "short", seed: int = SEED) -> str:
+    rng = random.Random(f"{seed}:claim:{kind}")
+    words = WORDS + UNICODE_WORDS if kind == "unicode" else WORDS
+    return "\n\n".join(
+        " ".join(_sentence(rng, words, rng.randint(8, 16)) for _ in range(4))
+        for _ in range(3)
+    )
@@ -0,0 +1,147 @@
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from . import data
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "app", "static", "logo2.jpg")
+FORMATS = ("pdf", "xlsx")
+# Fast scenarios keep repeating until this much time is measured (up to
+# MAX_REPEATS), so a 20 ms render isn't judged on three samples
+MIN_TIMED_SECONDS = 1.0
+MAX_REPEATS = 50
+# Slowdowns smaller than this are scheduler/cache noise whatever the ratio
+MIN_DELTA_SECONDS = 0.025
+
+
+@dataclass
+class Scenario:
+    format: str
+    rows: int
+    kind: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.format}-{self.rows}-{self.kind}"
+
+
+@dataclass
+class Measurement:
+    name: str
+    seconds: float          # median of the timed repeats
+    seconds_min: float      # what compare() judges: least disturbed by noise
+    peak_rss_mb: float      # whole worker process, imports included
+    rss_delta_mb: float     # growth over the process after imports and warm-up
+    bytes: int
+
+
+def scenarios(max_rows: Optional[int] = None) -> List[Scenario]:
+    return [
+        Scenario(fmt, rows, kind)
+        for fmt in FORMATS
+        for rows in data.ROW_COUNTS if max_rows is None or rows <= max_rows
+        for kind in data.TEXT_KINDS
+    ]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run(scenario: Scenario, repeats: int) -> Measurement:
+    """Runs in a fresh worker process, so peak RSS belongs to this scenario alone."""
+    from app.utils.render_pipeline import render_claim
+
+    estimate = data.estimate(scenario.rows, scenario.kind)
+    claim_text = data.claim_text(scenario.kind)
+
+    def once():
+        start = time.perf_counter()
+        result = render_claim(LOGO_PATH, "Benchmark Client", claim_text, estimate,
+                              formats=(scenario.format,), keys=None)
+        return time.perf_counter() - start, result.artifacts[scenario.format].size
+
+    # Warm-up with a tiny estimate: imports, fonts and the logo cache
+    render_claim(LOGO_PATH, "Benchmark Client", claim_text, data.estimate(1, scenario.kind),
+                 formats=(scenario.format,), keys=None)
+    base_rss = _peak_rss_mb()
+
+    times, size = [], 0
+    while len(times) < repeats or (sum(times) < MIN_TIMED_SECONDS and len(times) < MAX_REPEATS):
+        seconds, size = once()
+        times.append(seconds)
+    peak = _peak_rss_mb()
+    return Measurement(scenario.name, statistics.median(times), min(times),
+                       round(peak, 1), round(peak - base_rss, 1), size)
+
+
+def run(selected: List[Scenario], repeats: int = 3, on_result=None) -> Dict[str, Measurement]:
+    results = {}
+    # One process per scenario: RSS peaks can't leak from one into the next
+    ctx = multiprocessing.get_context("spawn")
+    for scenario in selected:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            measurement = pool.submit(_run, scenario, repeats).result()
+        results[scenario.name] = measurement
+        if on_result:
+            on_result(measurement)
+    return results
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baselines(path: str = BASELINES_PATH) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_baselines(results: Dict[str, Measurement], path: str = BASELINES_PATH) -> None:
+    # Merge, so a filtered run only refreshes the scenarios it ran
+    stored = load_baselines(path) or {}
+    scenarios_ = stored.get("scenarios", {})
+    scenarios_.update({name: asdict(m) for name, m in results.items()})
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"machine": machine(), "scenarios": dict(sorted(scenarios_.items()))},
+                  fh, indent=2, ensure_ascii=False)
+        fh.write("\n")
+
+
+def compare(results: Dict[str, Measurement], baselines: dict, threshold: float) -> List[str]:
+    """Scenarios slower (fastest run) or bigger in memory than baseline by more than threshold."""
+    regressions = []
+    stored = baselines.get("scenarios", {})
+    for name, m in results.items():
+        base = stored.get(name)
+        if base is None:
+            continue
+        # The fastest run moves far less between runs than the median on a busy box
+        base_min = base["seconds_min"]
+        if (m.seconds_min > base_min * (1 + threshold)
+                and m.seconds_min - base_min >= MIN_DELTA_SECONDS):
+            regressions.append(f"{name}: {m.seconds_min:.3f}s vs baseline {base_min:.3f}s (min)")
+        # Small deltas are noise (allocator, page cache); only judge >= 8 MB baselines
+        if base["rss_delta_mb"] >= 8 and m.rss_delta_mb > base["rss_delta_mb"] * (1 + threshold):
+            regressions.append(
+                f"{name}: +{m.rss_delta_mb:.1f} MB RSS vs baseline +{base['rss_delta_mb']:.1f} MB")
+    return regressions